@@ -0,0 +1,75 @@
+"""Pairwise outer merge (previous implementation) vs the single aligned array used by load_multiple_price_data.
+
+    python benchmarks/bench_alignment.py [--tickers 500] [--years 50]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.data_loader import _align_prices
+
+
+def synthetic_prices(n_tickers: int, years: int, seed: int = 0) -> list[pd.Series]:
+    """Random-walk closes; every ticker starts on a different day so the date union is ragged"""
+
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(end="2025-01-01", periods=years*365, name="Date")
+    weekdays = days[days.dayofweek < 5]
+    prices = []
+    for i in range(n_tickers):
+        index = weekdays[rng.integers(0, len(weekdays)//2):]
+        close = 100*np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+        prices.append(pd.Series(close, index=index, name=f"T{i:03d}"))
+    return prices
+
+
+def pairwise_merge(prices: list[pd.Series]) -> pd.DataFrame:
+    dfs = [p.rename_axis("Date").reset_index() for p in prices]
+    merged_df = dfs[0]
+    for d in dfs[1:]:
+        merged_df = pd.merge(merged_df, d, on="Date", how="outer")
+
+    warnings.simplefilter("ignore", pd.errors.PerformanceWarning) #the merged frame is fragmented, that is the point
+    merged_df = merged_df.sort_values("Date")
+    price_cols = [c for c in merged_df.columns if c != "Date"]
+    merged_df[price_cols] = merged_df[price_cols].ffill()
+    merged_df["Portfolio"] = merged_df[price_cols].mean(axis=1)
+    return merged_df
+
+
+def measure(fn, prices):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(prices)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=50)
+    args = parser.parse_args()
+
+    prices = synthetic_prices(args.tickers, args.years)
+    results = {}
+    for label, fn in (("pairwise merge", pairwise_merge), ("aligned array", _align_prices)):
+        result, elapsed, peak = measure(fn, prices)
+        results[label] = result
+        print(f"{label:<15} {elapsed:7.2f}s  peak {peak/1024**2:8.1f} MB  shape={result.shape}")
+
+    pd.testing.assert_frame_equal(results["pairwise merge"], results["aligned array"], check_exact=True)
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Local price archives (dca_simulator.file_source) in each format: one ticker's closes over a few
+years out of a large wide file or a directory of per-ticker files, against parsing the whole CSV.
+
+    python benchmarks/bench_file_source.py [--tickers 500] [--years 50] [--slice-years 10] [--dir DIR]
+
+The archives are written to --dir (a temporary directory by default). Needs pyarrow.
+Before timing, a yfinance-style export crossing a daylight saving time change (-05:00 then -04:00
+offsets) is read back in every format and must give the local dates.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.data_loader import _align_prices
+from dca_simulator.file_source import FileSource
+from bench_alignment import synthetic_prices
+
+
+WRITERS = {
+    "csv": lambda df, path: df.to_csv(path),
+    "parquet": lambda df, path: df.to_parquet(path, row_group_size=50000),
+    "arrow": lambda df, path: df.reset_index().to_feather(path, compression="uncompressed"), #mappable
+}
+
+
+def best_of(fn, *args, repeat: int = 3):
+    """(result, fastest of repeat calls)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def check_time_zones(directory: str):
+    """Closes exported with New York offsets across the 2024-03-10 DST change, in every format, per-ticker
+    and wide (ticker names in any case), must come back on their naive local dates"""
+
+    dates = pd.bdate_range("2024-02-01", "2024-04-30", tz="America/New_York", name="Date")
+    df = pd.DataFrame({"Close": np.arange(len(dates), dtype=float)}, index=dates)
+    for fmt, write in WRITERS.items():
+        per_ticker = os.path.join(directory, "dst", fmt)
+        os.makedirs(per_ticker, exist_ok=True)
+        write(df, os.path.join(per_ticker, f"SPY.{fmt}"))
+        write(df.rename(columns={"Close": "Spy"}), os.path.join(directory, "dst", f"wide.{fmt}"))
+        for path in (per_ticker, os.path.join(directory, "dst", f"wide.{fmt}")):
+            source = FileSource(path)
+            assert "spy" in source and "SPY" in source, (fmt, path)
+            read = source.read("spy", "2024-03-08", "2024-03-12")
+            assert list(read.index) == [pd.Timestamp("2024-03-08"), pd.Timestamp("2024-03-11")], (fmt, path, read.index)
+            assert (source.read("SPY").index == dates.tz_localize(None)).all(), (fmt, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--slice-years", type=int, default=10)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="dca_archive_")
+    check_time_zones(directory)
+    wide = _align_prices(synthetic_prices(args.tickers, args.years)).drop(columns="Portfolio").set_index("Date")
+    ticker = wide.columns[len(wide.columns)//2]
+    end = wide.index[-1]
+    start = end - pd.DateOffset(years=args.slice_years)
+    print(f"{args.tickers} tickers x {len(wide)} days, reading {ticker} {start:%Y-%m-%d} -> {end:%Y-%m-%d} ({directory})")
+
+    for fmt, write in WRITERS.items():
+        wide_path = os.path.join(directory, f"wide.{fmt}")
+        per_ticker = os.path.join(directory, fmt)
+        os.makedirs(per_ticker, exist_ok=True)
+        write(wide, wide_path)
+        for name in wide.columns[:50]: #enough files for the directory scan to count
+            write(wide[[name]].dropna().rename(columns={name: "Close"}), os.path.join(per_ticker, f"{name}.{fmt}"))
+        write(wide[[ticker]].dropna().rename(columns={ticker: "Close"}), os.path.join(per_ticker, f"{ticker}.{fmt}"))
+
+        size = os.path.getsize(wide_path)/1024**2
+        print(f"{fmt} (wide file {size:.0f} MB)")
+        if fmt == "csv":
+            _, elapsed = best_of(pd.read_csv, wide_path)
+            print(f"    {'pd.read_csv, whole file':<34} {elapsed*1e3:9.1f}ms")
+
+        for label, path in (("wide file", wide_path), ("file per ticker", per_ticker)):
+            _, elapsed = best_of(FileSource, path)
+            print(f"    {'open ' + label:<34} {elapsed*1e3:9.1f}ms")
+            source = FileSource(path)
+            _, first = best_of(source.read, ticker, start, end, repeat=1) #a wide CSV is parsed here
+            df, elapsed = best_of(source.read, ticker, start, end)
+            print(f"    {'read one slice, ' + label:<34} {elapsed*1e3:9.1f}ms   ({len(df)} rows, first read {first*1e3:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Value averaging accounting: the original iterrows/.loc loop vs the kernels of dca_simulator.kernels
+(Python float loop, NumPy vectorized over paths, Numba when installed), on one 50-year series and
+on a Monte Carlo batch of paths.
+
+    python benchmarks/bench_kernels.py [--years 50] [--paths 10000] [--path-years 30] [--sample 100]
+
+The per-path loops are timed on --sample paths of the batch and scaled to the whole batch.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator import kernels
+from dca_simulator.kernels import simulate_targets_batch
+from dca_simulator.montecarlo import gbm_paths
+from dca_simulator.strategies import ValueAveraging
+
+
+def iterrows_loop(close: np.ndarray, targets: np.ndarray):
+    """The original value_averaging loop: iterrows over a monthly frame with .loc writes"""
+
+    monthly = pd.DataFrame({"Close": close, "target": targets})
+    shares_total = 0.0
+    invested_total = 0.0
+    for i, row in monthly.iterrows():
+        investment = row["target"] - shares_total*row["Close"]
+        if investment > 0:
+            shares_total += investment/row["Close"]
+            invested_total += investment
+        monthly.loc[i, "shares_total"] = shares_total
+        monthly.loc[i, "invested_total"] = invested_total
+    return monthly["shares_total"].to_numpy(), monthly["invested_total"].to_numpy()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def per_path(fn, paths, targets):
+    """Run a one-path function on every row"""
+    rows = [fn(row, targets) for row in paths]
+    return np.array([r[0] for r in rows]), np.array([r[1] for r in rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=50, help="length of the single series")
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--path-years", type=int, default=30)
+    parser.add_argument("--sample", type=int, default=100, help="paths timed with the per-path loops")
+    args = parser.parse_args()
+
+    backends = ["numpy"] + (["numba"] if kernels.have_numba() else [])
+    if "numba" in backends:
+        simulate_targets_batch(np.ones((1, 2)), np.ones(2), backend="numba") #compile (or load from the cache)
+    else:
+        print("numba is not installed, only the NumPy kernels are timed")
+
+    va = ValueAveraging(0.006, 150)
+
+    #one long series
+    close = gbm_paths(0.08, 0.18, 1, 12*args.years, seed=0)[0]
+    targets = va.goals(len(close))
+    reference, elapsed = timed(iterrows_loop, close, targets)
+    print(f"{args.years}y, 1 path")
+    print(f"    {'iterrows + .loc':<22} {elapsed*1e3:10.2f}ms")
+    for backend in backends:
+        result, elapsed = timed(simulate_targets_batch, close, targets, backend)
+        assert all(np.array_equal(a, b) for a, b in zip(result, reference)), backend
+        print(f"    {backend + ' kernel':<22} {elapsed*1e3:10.2f}ms")
+
+    #Monte Carlo batch
+    paths = gbm_paths(0.08, 0.18, args.paths, 12*args.path_years + 1, seed=1)
+    targets = va.targets_batch(paths)
+    sample = paths[:args.sample]
+    scale = len(paths)/len(sample)
+    print(f"{args.path_years}y, {len(paths)} paths")
+
+    reference, elapsed = timed(per_path, iterrows_loop, sample, targets)
+    print(f"    {'iterrows + .loc':<22} {elapsed*scale:10.2f}s   (scaled from {len(sample)} paths)")
+    one_path = lambda row, targets: simulate_targets_batch(row, targets, "numpy")
+    result, elapsed = timed(per_path, one_path, sample, targets)
+    assert all(np.array_equal(a, b) for a, b in zip(result, reference))
+    print(f"    {'python loop per path':<22} {elapsed*scale:10.2f}s   (scaled from {len(sample)} paths)")
+
+    for backend in backends:
+        result, elapsed = timed(simulate_targets_batch, paths, targets, backend)
+        assert all(np.array_equal(a[:len(sample)], b) for a, b in zip(result, reference)), backend
+        print(f"    {backend + ' kernel':<22} {elapsed:10.3f}s")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
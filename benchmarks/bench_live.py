@@ -0,0 +1,99 @@
+"""Nightly refresh of tracked portfolios: appending one new trading day to a live strategy state
+(dca_simulator.live) against re-running the strategy and its metrics on the whole history.
+
+    python benchmarks/bench_live.py [--tickers 50] [--years 30]
+
+Every strategy is tracked on every ticker (tickers x 6 portfolios). The JSON round-trip of the
+states (what refresh() reads and writes) is timed separately. Before timing, every strategy is
+updated week by week across three months without bars, saved and loaded back after each update,
+and must end on the frame of a full run.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.indicators import IndicatorCache
+from dca_simulator.live import LiveStrategy
+from dca_simulator.metrics import key_metrics
+from dca_simulator.strategies import STRATEGIES, run_strategy
+from bench_alignment import synthetic_prices
+
+
+def check_empty_months(seed: int = 0):
+    """Weekly updates across a trading halt (months without bars: NaN rows, float signals), each
+    followed by a save / load of the state, against run_strategy on the whole history"""
+
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", "2019-12-31", name="Date")
+    df = pd.DataFrame({"Close": 100*np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))}, index=dates)
+    df = df[(df.index < "2018-03-01") | (df.index >= "2018-06-01")]
+    path = os.path.join(tempfile.mkdtemp(prefix="dca_live_"), "state.json")
+    for name in STRATEGIES:
+        cut = df.index.searchsorted(pd.Timestamp("2018-02-15"))
+        live = LiveStrategy.start(name, df.iloc[:cut], monthly_contrib=150)
+        for week in range(cut, len(df), 5):
+            live.update(df.iloc[week:week + 5])
+            json.dumps(live.to_dict(), allow_nan=False) #plain JSON, no NaN literals
+            live.save(path)
+            live = LiveStrategy.load(path)
+        pd.testing.assert_frame_equal(live.frame, run_strategy(name, df, monthly_contrib=150), check_freq=False, rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--years", type=int, default=30)
+    args = parser.parse_args()
+
+    check_empty_months()
+    histories = [series.to_frame("Close") for series in synthetic_prices(args.tickers, args.years)]
+    params = {"monthly_contrib": 150}
+    print(f"{args.tickers*len(STRATEGIES)} portfolios ({args.tickers} tickers x {len(STRATEGIES)} strategies), up to {args.years}y of daily bars")
+
+    #the first trading day of the last month adds a month to every strategy, the next day only joins the closes
+    last_month = [int(np.flatnonzero(np.diff(df.index.month) != 0)[-1]) + 1 for df in histories]
+    for label, cuts in (("append a mid-month day", [cut + 1 for cut in last_month]), ("append a new month's day", last_month)):
+        tracked = [(df.iloc[:cut + 1], [LiveStrategy.start(name, df.iloc[:cut], **params) for name in STRATEGIES])
+                   for df, cut in zip(histories, cuts)]
+        states = [live for _, lives in tracked for live in lives]
+        for live in states:
+            live.metrics() #the nightly job starts from saved states, IRR guess included
+
+        start = time.perf_counter()
+        full = []
+        for df, _ in tracked:
+            indicators = IndicatorCache() #shared by the strategies of a ticker, like a batch job
+            full.append({name: key_metrics(run_strategy(name, df, indicators=indicators, **params)) for name in STRATEGIES})
+        rerun = time.perf_counter() - start
+
+        incremental = updating = 0.0
+        for (df, lives), reference in zip(tracked, full):
+            for live in lives:
+                start = time.perf_counter()
+                live.update(df.iloc[-1:])
+                updated = time.perf_counter()
+                metrics = live.metrics()
+                incremental += time.perf_counter() - start
+                updating += updated - start
+                assert np.isclose(metrics["IRR"], reference[live.name]["IRR"], rtol=1e-8, equal_nan=True)
+        print(f"    {label:<26} {incremental:8.3f}s   full re-run {rerun:6.2f}s   ({rerun/incremental:.0f}x faster, same metrics; "
+              f"update {updating:.3f}s, the rest is the IRR over the whole history)")
+
+    start = time.perf_counter()
+    size = 0
+    for live in states:
+        text = json.dumps(live.to_dict())
+        size += len(text)
+        LiveStrategy.from_dict(json.loads(text))
+    print(f"    {'JSON save + load':<26} {time.perf_counter() - start:8.2f}s   ({size/len(states)/1024:.0f} KB per state)")
+
+
+if __name__ == "__main__":
+    main()
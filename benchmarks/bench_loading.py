@@ -0,0 +1,84 @@
+"""Serial vs concurrent load_multiple_price_data with a local fake downloader.
+
+    python benchmarks/bench_loading.py [--tickers 15] [--latency 0.3]
+
+Also checks that the price cache does not download a weekend gap again on the next call.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator import data_loader
+from dca_simulator.price_cache import PriceCache
+
+
+def fake_downloader(latency: float):
+    """Synthetic random-walk closes per ticker, after sleeping `latency` seconds like a network round-trip"""
+
+    days = pd.date_range("1970-01-01", "2030-01-01", name="Date")
+    weekdays = days[days.dayofweek < 5]
+
+    def download(ticker, start_date, end_date):
+        time.sleep(latency)
+        index = weekdays[(weekdays >= start_date) & (weekdays < end_date)]
+        rng = np.random.default_rng(sum(map(ord, ticker)))
+        close = 100*np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+        return pd.DataFrame({"Close": close}, index=index)
+
+    return download
+
+
+def check_weekend_gap():
+    """A gap that downloads without bars (Saturday to Monday) is served from the cache next time"""
+
+    calls = []
+    download = fake_downloader(0)
+
+    def counting(ticker, start_date, end_date):
+        calls.append((start_date, end_date))
+        return download(ticker, start_date, end_date)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PriceCache(directory, downloader=counting)
+        cache.get("AAA", "2024-01-01", "2024-01-06") #covered up to Saturday
+        weekend = cache.get("AAA", "2024-01-01", "2024-01-08")
+        assert calls[-1] == ("2024-01-06", "2024-01-08") and len(weekend) == 5
+        calls.clear()
+        assert cache.get("AAA", "2024-01-01", "2024-01-08").equals(weekend)
+        assert not calls, calls
+        assert len(cache.get("AAA", "2024-01-01", "2024-01-09")) == 6 #Monday is a new gap
+        assert calls == [("2024-01-06", "2024-01-09")], calls
+    print("weekend gap cached")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    tickers = [f"T{i:03d}" for i in range(args.tickers)]
+    downloader = fake_downloader(args.latency)
+    data_loader.set_price_cache(None) #measure the download path, not the disk cache
+
+    timings = {}
+    for label, workers in (("serial", 1), ("concurrent", args.workers)):
+        start = time.perf_counter()
+        merged = data_loader.load_multiple_price_data(tickers, "1975-01-01", "2025-01-01",
+                                                      max_workers=workers, downloader=downloader)
+        timings[label] = time.perf_counter() - start
+        print(f"{label:<11} workers={workers:<3} {timings[label]:7.2f}s  shape={merged.shape}")
+
+    print(f"speedup: {timings['serial']/timings['concurrent']:.1f}x")
+    check_weekend_gap()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Key metrics (dca_simulator.metrics) against the original compute_KeyMetrics, which solved the IRR
+with numpy_financial.irr, on every strategy over random walks, steady rises and crashes (prices
+down 90-99.9% within a few months, where the monthly IRR goes well below -30%).
+
+    python benchmarks/bench_metrics.py [--seeds 5]
+
+The IRR must agree to 1e-6 and display the same string.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import numpy_financial as npf
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.metrics import compute_KeyMetrics, key_metrics
+from dca_simulator.strategies import STRATEGIES, run_strategy
+
+
+def reference_irr(df) -> float:
+    """Annual IRR (%) the way the original compute_KeyMetrics solved it"""
+
+    cashflows = [-float(df["invested_total"].iloc[0])]
+    cashflows.extend((-df["invested_total"].diff().iloc[1:]).astype(float).tolist())
+    cashflows[-1] += float(df["portf_value"].iloc[-1])
+    irr_monthly = npf.irr(np.array(cashflows, dtype=float))
+    return ((1 + irr_monthly)**12 - 1)*100 if irr_monthly == irr_monthly else np.nan
+
+
+def price_paths(seed: int) -> dict:
+    """{label: daily closes} over 0.2 to 20 years"""
+
+    rng = np.random.default_rng(seed)
+    paths = {}
+    for years in (0.2, 0.5, 1, 2, 5, 20):
+        n = int(252*years)
+        dates = pd.bdate_range(end="2025-01-01", periods=n, name="Date")
+        walk = 100*np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+        crash = min(n, 63) #a quarter, or the whole path when shorter
+        depth = rng.uniform(np.log(1e-3), np.log(0.1))
+        closes = {
+            "walk": walk,
+            "rise": 100*np.exp(np.linspace(0, 0.002*n, n)),
+            "crash": walk*np.exp(np.r_[np.zeros(n - crash), np.linspace(0, depth, crash)]),
+        }
+        for kind, close in closes.items():
+            paths[f"{kind} {years}y"] = pd.DataFrame({"Close": close}, index=dates)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = below = 0
+    reference_time = elapsed = 0.0
+    for seed in range(args.seeds):
+        for label, df in price_paths(seed).items():
+            for name in STRATEGIES:
+                result = run_strategy(name, df, monthly_contrib=150)
+                if result.empty:
+                    continue
+                start = time.perf_counter()
+                expected = reference_irr(result)
+                reference_time += time.perf_counter() - start
+                start = time.perf_counter()
+                irr = key_metrics(result)["IRR"]
+                elapsed += time.perf_counter() - start
+
+                assert np.isclose(irr, expected, rtol=1e-6, atol=1e-8, equal_nan=True), (seed, label, name, irr, expected)
+                expected_irr = f"{expected:,.2f}%" if expected == expected else "—"
+                assert compute_KeyMetrics(result)["IRR"] == expected_irr, (seed, label, name)
+                runs += 1
+                below += expected < ((1 - 0.3)**12 - 1)*100
+    print(f"{runs} strategy runs, {below} with a monthly IRR below -30%")
+    print(f"    numpy_financial.irr {reference_time:8.3f}s   key_metrics {elapsed:6.3f}s   ({reference_time/elapsed:.0f}x faster)")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Monte Carlo simulation of every strategy over synthetic 30-year paths.
+
+    python benchmarks/bench_montecarlo.py [--paths 10000] [--years 30] [--workers 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.montecarlo import (block_bootstrap_paths, fit_gbm, gbm_paths, monthly_log_returns,
+                                      simulate_paths, summarize_paths)
+from bench_alignment import synthetic_prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=1, help="processes (0: every CPU)")
+    args = parser.parse_args()
+
+    history = synthetic_prices(1, 50)[0].to_frame("Close")
+    n_months = 12*args.years + 1
+
+    for label, generate in (("block bootstrap", lambda: block_bootstrap_paths(monthly_log_returns(history), args.paths, n_months, seed=0)),
+                            ("GBM", lambda: gbm_paths(*fit_gbm(history), args.paths, n_months, seed=0))):
+        start = time.perf_counter()
+        paths = generate()
+        generated = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = simulate_paths(paths, max_workers=args.workers or None, monthly_contrib=150)
+        elapsed = time.perf_counter() - start
+
+        n_strategies = results["strategy"].nunique()
+        print(f"{label}: {paths.shape[0]} paths x {paths.shape[1]} months, generated in {generated:.2f}s, "
+              f"{n_strategies} strategies in {elapsed:.2f}s ({len(results)/elapsed:,.0f} backtests/s)")
+        print(summarize_paths(results, fields=("IRR",), percentiles=(0.05, 0.5, 0.95)).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
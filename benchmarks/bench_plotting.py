@@ -0,0 +1,69 @@
+"""Bokeh payload and render time of the price preview, every daily point vs server-side downsampling.
+
+    python benchmarks/bench_plotting.py [--tickers 15] [--years 50] [--points 1000]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+import holoviews as hv
+import hvplot.pandas  # noqa: F401
+import numpy as np
+from bokeh.embed import json_item
+from holoviews.operation.downsample import downsample1d
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_alignment import synthetic_prices
+from dca_simulator.data_loader import _align_prices
+from dca_simulator.plots import downsample_plot
+
+
+def preview_plot(merged):
+    """Same plot as the app's multi-ticker preview"""
+    price_cols = [c for c in merged.columns if c not in ["Date", "Portfolio"]]
+    return merged.hvplot.line(x="Date", y=price_cols, ylabel="Stock Price ($)", title="Selected Tickers Price History",
+                              height=500, responsive=True, legend="left", line_width=1).opts(legend_spacing=1)
+
+
+def measure(obj):
+    """(render seconds, serialized payload bytes, points sent) of a plot"""
+
+    start = time.perf_counter()
+    fig = hv.render(obj, backend="bokeh")
+    payload = json.dumps(json_item(fig))
+    elapsed = time.perf_counter() - start
+    points = sum(len(r.data_source.data["Date"]) for r in fig.renderers if hasattr(r, "data_source"))
+    return elapsed, len(payload), points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=15)
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--points", type=int, default=1000, help="points per line after downsampling")
+    args = parser.parse_args()
+
+    logging.getLogger("bokeh").setLevel(logging.ERROR) #standalone json_item of a DynamicMap warns about server callbacks
+
+    merged = _align_prices(synthetic_prices(args.tickers, args.years))
+    plot = preview_plot(merged)
+    print(f"{args.tickers} tickers x {len(merged)} days")
+    for label, obj in (("every point", plot), (f"lttb {args.points}", downsample_plot(plot, args.points))):
+        elapsed, size, points = measure(obj)
+        print(f"{label:<12} render+serialize {elapsed:6.2f}s  payload {size/1024**2:7.2f} MB  points {points:>9,}")
+
+    #zoomed in on one year (fewer points than the budget), the downsampled curve is the exact series
+    dates = merged["Date"].to_numpy()
+    x_range = (dates[-260], dates[-1])
+    zoomed = downsample1d(plot, width=args.points, x_range=x_range, dynamic=False)
+    exact = plot.select(Date=x_range)
+    for name in exact.keys():
+        np.testing.assert_array_equal(zoomed[name].dimension_values(1), exact[name].dimension_values(1))
+    print("zoomed window is drawn exactly")
+
+
+if __name__ == "__main__":
+    main()
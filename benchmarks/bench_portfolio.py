@@ -0,0 +1,63 @@
+"""Multi-asset portfolio engine on a large universe: the daily unit value the strategies run on
+(portfolio_index) and the per-ticker holdings of monthly DCA (run_portfolio), per rebalancing.
+
+    python benchmarks/bench_portfolio.py [--tickers 500] [--years 50] [--weighting equal]
+
+Checked on the way: with monthly rebalancing, DCA on portfolio_index and run_portfolio agree to
+1e-12, and the price weighting without rebalancing is proportional to the former average of prices.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.data_loader import _align_prices
+from dca_simulator.portfolio import REBALANCE_MONTHS, portfolio_index, run_portfolio
+from dca_simulator.strategies import run_strategy
+from bench_alignment import synthetic_prices
+
+
+def measure(fn, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--weighting", default="equal", choices=["equal", "market_cap", "price"])
+    args = parser.parse_args()
+
+    prices = _align_prices(synthetic_prices(args.tickers, args.years))
+    print(f"{args.tickers} tickers x {len(prices)} days, {args.weighting} weighting")
+    for rebalance in REBALANCE_MONTHS:
+        index, index_time, index_peak = measure(portfolio_index, prices, args.weighting, rebalance)
+        (frame, holdings), run_time, run_peak = measure(run_portfolio, prices, 150, args.weighting, rebalance)
+        print(f"    {rebalance:<10} portfolio_index {index_time:6.2f}s (peak {index_peak/1024**2:6.1f} MB)   "
+              f"run_portfolio {run_time:6.2f}s (peak {run_peak/1024**2:6.1f} MB, holdings {holdings.shape})   "
+              f"final value {frame['portf_value'].iloc[-1]:,.0f}")
+        if rebalance == "monthly": #the index holds the weights every month, so buying units of it is the same DCA
+            dca = run_strategy("DCA", index.to_frame(), monthly_contrib=150)
+            assert np.allclose(dca["portf_value"], frame["portf_value"], rtol=1e-12, atol=0)
+            assert np.allclose(dca["invested_total"], frame["invested_total"], rtol=1e-12, atol=0)
+
+    #the portfolio of the former versions: the average of the prices, on the days every ticker is listed
+    listed = prices.dropna()
+    index = portfolio_index(listed, "price", "never")
+    average = listed["Portfolio"].to_numpy()
+    assert np.allclose(index/index.iloc[0], average/average[0], rtol=1e-12, atol=0)
+    print("DCA on the index = run_portfolio (monthly rebalancing), price weighting = average of prices")
+
+
+if __name__ == "__main__":
+    main()
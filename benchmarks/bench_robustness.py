@@ -0,0 +1,67 @@
+"""Rolling start-month analysis (dca_simulator.robustness) against one backtest per window, on a
+clean daily series and on one with a 3-month trading halt (months without bars).
+
+    python benchmarks/bench_robustness.py [--years 30] [--horizon 10]
+
+DCA and Lump Sum have no signals, so every window must match run_strategy + key_metrics on the
+window's own bars; windows that start or end in a month without bars are skipped (a backtest of
+the window starts or ends at another month there). A gap must only turn the windows that
+contain it NaN.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.metrics import KEY_METRICS_DTYPE, key_metrics
+from dca_simulator.robustness import rolling_start_analysis
+from dca_simulator.strategies import run_strategy
+from bench_strategies import price_series
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--horizon", type=int, default=10)
+    args = parser.parse_args()
+
+    series = price_series(args.years)
+    for label in ("clean", "missing months"):
+        df = series[label]
+        start = time.perf_counter()
+        results = rolling_start_analysis(df, args.horizon, monthly_contrib=150)
+        elapsed = time.perf_counter() - start
+
+        has_bars = df["Close"].resample("MS").first().notna()
+        loop_time = 0.0
+        compared = with_gap = 0
+        for name in ("DCA", "Lump Sum"):
+            for row in results[results["strategy"] == name].itertuples():
+                window = df[(df.index >= row.start) & (df.index < row.end + pd.offsets.MonthBegin(1))]
+                if not (has_bars[row.start] and has_bars[row.end]):
+                    continue
+                begin = time.perf_counter()
+                expected = key_metrics(run_strategy(name, window, monthly_contrib=150))
+                loop_time += time.perf_counter() - begin
+                for field in KEY_METRICS_DTYPE.names:
+                    assert np.isclose(getattr(row, field), expected[field], rtol=1e-9, equal_nan=True), \
+                        (label, name, row.start, field, getattr(row, field), expected[field])
+                compared += 1
+                with_gap += not has_bars[row.start:row.end].all()
+
+        #DCA buys in every month, so exactly the windows containing a month without bars are NaN
+        dca = results[results["strategy"] == "DCA"]
+        gap = np.array([not has_bars[row.start:row.end].all() for row in dca.itertuples()])
+        assert (dca["IRR"].isna().to_numpy() == gap).all(), label
+
+        print(f"{label:<15} {len(results)} windows in {elapsed*1e3:6.1f}ms   "
+              f"{compared} DCA / Lump Sum windows checked ({with_gap} across a gap, {loop_time:5.2f}s one by one)")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
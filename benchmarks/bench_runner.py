@@ -0,0 +1,36 @@
+"""Scaling of run_universe with the number of worker processes.
+
+    python benchmarks/bench_runner.py [--tickers 100] [--years 30]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.data_loader import _align_prices
+from dca_simulator.runner import run_universe
+from bench_alignment import synthetic_prices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--years", type=int, default=30)
+    args = parser.parse_args()
+
+    prices = _align_prices(synthetic_prices(args.tickers, args.years))
+    cores = os.cpu_count() or 1
+    workers = sorted({1, *(w for w in (2, 4, 8, 16, 32) if w <= cores), cores})
+
+    baseline = None
+    for n in workers:
+        start = time.perf_counter()
+        result = run_universe(prices, max_workers=n, monthly_contrib=150)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={n:<3} {elapsed:7.2f}s  speedup {baseline/elapsed:4.1f}x  rows={len(result)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold start of the app and of the batch CLI, measured with `python -X importtime` in fresh interpreters.
+
+    python benchmarks/bench_startup.py [--runs 3] [--budget 1.0]
+
+Fails (exit code 1) when a module that must stay lazy is imported at startup, or when the
+app's own import time (everything imported by interface.py except panel itself) exceeds
+the budget in seconds.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#modules loaded on first use only: plotting by the first preview/simulation, yfinance by the first download
+LAZY = {
+    "interface": ("hvplot", "holoviews", "matplotlib", "yfinance"),
+    "dca_simulator.__main__": ("panel", "bokeh", "hvplot", "holoviews", "matplotlib", "yfinance"),
+}
+
+
+def import_times(module: str) -> dict:
+    """{module: cumulative seconds} for every module imported by `import module` in a fresh interpreter"""
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)/1e6
+    return times
+
+
+def session_time(runs: int) -> float:
+    """Seconds to build one more app session once the modules are imported (panel serve re-runs the script per session)"""
+
+    code = ("import runpy, time\n"
+            "runpy.run_path('interface.py')\n"
+            "times = []\n"
+            f"for _ in range({runs}):\n"
+            "    t = time.perf_counter(); runpy.run_path('interface.py'); times.append(time.perf_counter() - t)\n"
+            "print(min(times))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module, the fastest run is kept")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds allowed for the app's imports beyond panel")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    args = parser.parse_args()
+
+    failures = []
+    for module, lazy in LAZY.items():
+        runs = [import_times(module) for _ in range(args.runs)]
+        times = min(runs, key=lambda t: t[module])
+        print(f"{module}: {times[module]:.2f}s")
+
+        top_level = sorted(((t, name) for name, t in times.items() if name != module and "." not in name), reverse=True)
+        for t, name in top_level[:args.top]:
+            print(f"    {name:<24} {t:6.3f}s")
+
+        loaded = [name for name in lazy if name in times]
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)} at startup")
+
+        if module == "interface":
+            own = times[module] - times.get("panel", 0.0)
+            print(f"    app imports beyond panel {own:.2f}s (budget {args.budget:.2f}s)")
+            if own > args.budget:
+                failures.append(f"interface import takes {own:.2f}s beyond panel, budget {args.budget:.2f}s")
+
+    print(f"new session once imported: {session_time(args.runs):.3f}s")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""The strategies of dca_simulator.strategies against the original iterrows/.loc loops they replaced,
+on a clean daily series, one with missing days and one with a whole month missing (empty months
+are NaN rows of the monthly resample). Outputs must be identical.
+
+    python benchmarks/bench_strategies.py [--years 50]
+
+The only difference allowed is the dtype of Lump Sum's invested_total: the original wrote the
+integer months x monthly_contrib (int64 for an integer contribution), the strategies write float64.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dca_simulator.strategies import STRATEGIES, run_strategy
+
+
+#the original implementations, unchanged but for the names
+
+def reference_dca_DD(df, monthly_contrib, DD_threshold=0.15):
+    df = df.copy()
+    df["12m_high"] = df["Close"].rolling(252).max()
+    df["drawdown"] = df["Close"]/df["12m_high"]
+    df["DD_cond"] = df["drawdown"] <= (1-DD_threshold)
+    monthly_investments = df.resample("MS").first()
+    monthly_investments["DD_cond"] = df["DD_cond"].resample("MS").first()
+    shares_total = 0
+    invested_total = 0
+    for date, row in monthly_investments.iterrows():
+        multiplier = 2 if row["DD_cond"] else 1
+        investment_amount = monthly_contrib * multiplier
+        shares_bought = investment_amount/row["Close"]
+        shares_total += shares_bought
+        invested_total += investment_amount
+        monthly_investments.loc[date, 'shares_total'] = shares_total
+        monthly_investments.loc[date, 'invested_total'] = invested_total
+        monthly_investments.loc[date, 'portf_value'] = shares_total * row['Close']
+    monthly_investments['profit_loss'] = monthly_investments['portf_value'] - monthly_investments['invested_total']
+    return monthly_investments
+
+
+def reference_dca_standard(df, monthly_contrib):
+    df = df.copy()
+    monthly_investments = df.resample("MS").first()
+    shares_total = 0
+    invested_total = 0
+    for date, row in monthly_investments.iterrows():
+        investment_amount = monthly_contrib
+        shares_bought = investment_amount/row["Close"]
+        shares_total += shares_bought
+        invested_total += investment_amount
+        monthly_investments.loc[date, 'shares_total'] = shares_total
+        monthly_investments.loc[date, 'invested_total'] = invested_total
+        monthly_investments.loc[date, 'portf_value'] = shares_total * row['Close']
+    monthly_investments['profit_loss'] = monthly_investments['portf_value'] - monthly_investments['invested_total']
+    return monthly_investments
+
+
+def reference_lump_sum(df, monthly_contrib):
+    df = df.copy()
+    monthly_investments = df.resample("MS").first()
+    total_months = len(monthly_investments)
+    total_capital = total_months*monthly_contrib
+    first_price = monthly_investments.loc[monthly_investments.index[0], "Close"]
+    shares_total = total_capital/first_price
+    monthly_investments["shares_total"] = shares_total
+    monthly_investments["invested_total"] = total_capital
+    monthly_investments["portf_value"] = shares_total*monthly_investments["Close"]
+    monthly_investments["profit_loss"] = (monthly_investments["portf_value"] - total_capital)
+    return monthly_investments
+
+
+def _reference_sma(df, monthly_contrib, sma_period, above):
+    df = df.copy()
+    df["sma"] = df["Close"].rolling(sma_period).mean()
+    df["above_sma"] = df["Close"] > df["sma"] if above else df["Close"] < df["sma"]
+    monthly_investments = df.resample("MS").first()
+    monthly_investments["above_sma"] = df["above_sma"].resample("MS").first()
+    shares_total = 0
+    invested_total = 0
+    for date, row in monthly_investments.iterrows():
+        if row["above_sma"] == True:
+            shares_bought = monthly_contrib/row["Close"]
+            shares_total += shares_bought
+            invested_total += monthly_contrib
+        monthly_investments.loc[date, "shares_total"] = shares_total
+        monthly_investments.loc[date, "invested_total"] = invested_total
+        monthly_investments.loc[date, "portf_value"] = shares_total*row["Close"]
+    monthly_investments["profit_loss"] = monthly_investments["portf_value"] - monthly_investments["invested_total"]
+    return monthly_investments
+
+
+def reference_dca_sma_mom(df, monthly_contrib, sma_period=90):
+    return _reference_sma(df, monthly_contrib, sma_period, above=True)
+
+
+def reference_dca_sma_mean_rev(df, monthly_contrib, sma_period=90):
+    return _reference_sma(df, monthly_contrib, sma_period, above=False)
+
+
+def reference_value_averaging(df, goal_monthly_growth=0.006, monthly_contrib=1000):
+    df = df.copy()
+    monthly_investments = df.resample("MS").first()
+    shares_total = 0
+    invested_total = 0
+    for i, (date, row) in enumerate(monthly_investments.iterrows()):
+        goal_val = monthly_contrib*(1+i)*(1+goal_monthly_growth)**i
+        current_val = shares_total * row["Close"]
+        investment_this_month = max(goal_val - current_val, 0)
+        if investment_this_month > 0:
+            shares_bought = investment_this_month / row["Close"]
+            shares_total += shares_bought
+            invested_total += investment_this_month
+        monthly_investments.loc[date, "shares_total"] = shares_total
+        monthly_investments.loc[date, "invested_total"] = invested_total
+        monthly_investments.loc[date, "portf_value"] = shares_total*row["Close"]
+    monthly_investments["profit_loss"] = monthly_investments["portf_value"] - monthly_investments["invested_total"]
+    return monthly_investments
+
+
+REFERENCES = {
+    "DCA": (reference_dca_standard, {"monthly_contrib": 150}),
+    "Double Down DCA": (reference_dca_DD, {"monthly_contrib": 150, "DD_threshold": 0.15}),
+    "Lump Sum": (reference_lump_sum, {"monthly_contrib": 150}),
+    "SMA Momentum": (reference_dca_sma_mom, {"monthly_contrib": 150, "sma_period": 90}),
+    "SMA Mean Reversion": (reference_dca_sma_mean_rev, {"monthly_contrib": 150, "sma_period": 90}),
+    "Value Averaging": (reference_value_averaging, {"goal_monthly_growth": 0.006, "monthly_contrib": 1000}),
+}
+
+
+def price_series(years: int, seed: int = 0) -> dict:
+    """Daily closes: clean, with 5% of the days missing, and with a 3-month trading halt"""
+
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2025-01-01", periods=252*years, name="Date")
+    close = pd.DataFrame({"Close": 100*np.exp(np.cumsum(rng.normal(0.0002, 0.015, len(dates))))}, index=dates)
+    halt = (dates >= dates[len(dates)//2]) & (dates < dates[len(dates)//2] + pd.DateOffset(months=3))
+    return {
+        "clean": close,
+        "missing days": close[rng.random(len(dates)) > 0.05],
+        "missing months": close[~halt],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=50)
+    args = parser.parse_args()
+
+    assert set(REFERENCES) == set(STRATEGIES), "every strategy needs a reference"
+    for label, df in price_series(args.years).items():
+        print(f"{label} ({len(df)} days)")
+        for name, (reference, params) in REFERENCES.items():
+            start = time.perf_counter()
+            expected = reference(df, **params)
+            loop_time = time.perf_counter() - start
+            start = time.perf_counter()
+            result = run_strategy(name, df, **params)
+            elapsed = time.perf_counter() - start
+
+            if name == "Lump Sum": #int64 in the original for an integer contribution
+                assert expected["invested_total"].dtype == np.int64
+                expected["invested_total"] = expected["invested_total"].astype(float)
+            pd.testing.assert_frame_equal(result, expected, check_exact=True, check_freq=False)
+            print(f"    {name:<20} loop {loop_time*1e3:8.1f}ms   now {elapsed*1e3:6.1f}ms")
+    print("outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Timing suite over synthetic data: every strategy, compute_KeyMetrics and data_process on 1 to 100
+years of daily closes, and load_multiple_price_data for 1 to 500 tickers (fake downloader, no network).
+
+    python benchmarks/bench_suite.py                  compare with benchmarks/baseline.json
+    python benchmarks/bench_suite.py --save           record the current timings as the baseline
+    python benchmarks/bench_suite.py -k strategy -k 100y
+
+Each case reports the median of --repeat samples (each sample loops the call for at least 0.2s).
+Fails (exit code 1) when a case is still slower than baseline x (1 + --tolerance) + --floor after a
+second measurement: the floor keeps millisecond cases from failing on scheduling noise, the
+tolerance applies to the longer ones. Cases without a baseline are reported but never fail.
+Baselines are machine specific, record them again with --save on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_loading import fake_downloader
+from dca_simulator import data_loader
+from dca_simulator.data_processing import data_process
+from dca_simulator.metrics import compute_KeyMetrics
+from dca_simulator.strategies import STRATEGIES, run_strategy
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+YEARS = (1, 10, 30, 100)
+TICKERS = (1, 50, 500)
+TICKER_YEARS = 10
+END = "2025-01-01"
+
+
+def prices(years: int, seed: int = 0) -> pd.DataFrame:
+    """Random-walk daily closes (weekdays) over `years` years up to END"""
+
+    days = pd.date_range(end=END, periods=years*365, name="Date")
+    index = days[days.dayofweek < 5]
+    close = 100*np.exp(np.cumsum(np.random.default_rng(seed).normal(0.0003, 0.02, len(index))))
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+def cases():
+    """{name: zero-argument callable}, the data of every case is built once beforehand"""
+
+    downloader = fake_downloader(0)
+    out = {}
+    for years in YEARS:
+        df = prices(years)
+        for name in STRATEGIES:
+            out[f"strategy[{name}]:{years}y"] = lambda name=name, df=df: run_strategy(name, df, monthly_contrib=150)
+        result = run_strategy("DCA", df, monthly_contrib=150)
+        out[f"compute_KeyMetrics:{years}y"] = lambda result=result: compute_KeyMetrics(result)
+        raw = df.iloc[::-1].reset_index().astype({"Date": str}).set_index("Date") #unsorted, string dates
+        out[f"data_process:{years}y"] = lambda raw=raw: data_process(raw)
+
+    start = f"{int(END[:4]) - TICKER_YEARS}{END[4:]}"
+    for n in TICKERS:
+        tickers = [f"T{i:03d}" for i in range(n)]
+        out[f"load_multiple_price_data:{n}x{TICKER_YEARS}y"] = (
+            lambda tickers=tickers: data_loader.load_multiple_price_data(tickers, start, END, downloader=downloader))
+    return out
+
+
+def measure(fn, repeat: int) -> float:
+    """Median seconds per call over `repeat` samples (steadier than the best one on a shared machine)"""
+
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange() #loops per sample so that one sample takes >= 0.2s
+    return float(np.median(timer.repeat(repeat=repeat, number=number)))/number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="only cases whose name contains this (repeatable, all must match)")
+    parser.add_argument("--repeat", type=int, default=9, help="samples per case, the median is kept")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown over the baseline (0.5 = 50%%)")
+    parser.add_argument("--floor", type=float, default=2.0, help="allowed slowdown in ms on top of the tolerance")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="write the timings to the baseline file (merged with the cases not run)")
+    args = parser.parse_args()
+
+    data_loader.set_price_cache(None) #time the loading and alignment, not the disk cache
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    timings = {}
+    regressions = []
+    print(f"{'case':<48} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, fn in cases().items():
+        if not all(f in name for f in args.filters):
+            continue
+        timings[name] = measure(fn, args.repeat)
+        before = baseline.get(name)
+        limit = before*(1 + args.tolerance) + args.floor/1e3 if before else float("inf")
+        if timings[name] > limit:
+            timings[name] = min(timings[name], measure(fn, args.repeat)) #confirm, a busy machine slows whole samples down
+        ratio = timings[name]/before if before else float("nan")
+        flag = ""
+        if timings[name] > limit:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        before_text = f"{before*1e3:8.2f}ms" if before else "         —"
+        print(f"{name:<48} {before_text} {timings[name]*1e3:8.2f}ms {ratio:7.2f}{flag}")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": {"python": platform.python_version(), "platform": platform.platform(),
+                                   "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()},
+                       "results": {**baseline, **timings}}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    for name in regressions:
+        print(f"FAIL: {name} is {timings[name]/baseline[name]:.2f}x its baseline "
+              f"(tolerance {1 + args.tolerance:.2f}x + {args.floor:g}ms)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Out-of-core universe backtests (runner.stream_universe) on growing universes: peak RSS should stay
+flat while the universe grows, against loading the whole universe and running run_universe.
+
+    python benchmarks/bench_universe.py [--tickers 100 400 1000] [--years 30] [--batch-size 100] [--workers 1]
+
+A Parquet file per ticker is written to --dir (a temporary directory by default), one ticker at a
+time. Each measurement runs in a fresh process so its peak RSS (ru_maxrss) is its own.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_archive(directory: str, n_tickers: int, years: int, seed: int = 0):
+    """Random-walk closes, one Parquet file per ticker, listed on different days (like bench_alignment)"""
+
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(end="2025-01-01", periods=years*365, name="Date")
+    weekdays = days[days.dayofweek < 5]
+    for i in range(n_tickers):
+        path = os.path.join(directory, f"T{i:05d}.parquet")
+        index = weekdays[rng.integers(0, len(weekdays)//2):]
+        close = 100*np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+        if not os.path.exists(path):
+            pd.DataFrame({"Close": close}, index=index).to_parquet(path)
+
+
+def child(args):
+    """One measurement, prints a JSON line"""
+
+    from dca_simulator.file_source import FileSource
+    from dca_simulator.runner import run_universe, stream_universe
+
+    source = FileSource(args.dir)
+    tickers = source.tickers()[:args.child_tickers]
+    start = time.perf_counter()
+    if args.child == "stream":
+        rows = stream_universe(source, os.path.join(args.dir, "results", f"stream_{len(tickers)}.parquet"), tickers=tickers,
+                               batch_size=args.batch_size, max_workers=args.workers, monthly_contrib=150)
+    else:
+        rows = len(run_universe(source.read_many(tickers), max_workers=args.workers, monthly_contrib=150))
+    elapsed = time.perf_counter() - start
+    usage = [resource.getrusage(resource.RUSAGE_SELF)] + ([resource.getrusage(resource.RUSAGE_CHILDREN)] if args.workers != 1 else [])
+    print(json.dumps({"rows": rows, "elapsed": elapsed, "peak_mb": max(u.ru_maxrss for u in usage)/1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[100, 400, 1000])
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--in-memory-max", type=int, default=400, help="largest universe also run in memory")
+    parser.add_argument("--dir", default=None)
+    parser.add_argument("--child", choices=["stream", "memory"], help=argparse.SUPPRESS)
+    parser.add_argument("--child-tickers", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    args.dir = args.dir or tempfile.mkdtemp(prefix="dca_universe_")
+    start = time.perf_counter()
+    write_archive(args.dir, max(args.tickers), args.years)
+    print(f"archive: {max(args.tickers)} tickers x up to {args.years}y in {args.dir} ({time.perf_counter() - start:.0f}s)")
+    print(f"{'tickers':>8} {'mode':<10} {'peak RSS':>10} {'tickers/s':>10} {'elapsed':>9}")
+
+    for n in args.tickers:
+        for mode in ("stream", "memory"):
+            if mode == "memory" and n > args.in_memory_max:
+                continue
+            command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--child-tickers", str(n), "--dir", args.dir,
+                       "--batch-size", str(args.batch_size), "--workers", str(args.workers)]
+            result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout.splitlines()[-1])
+            print(f"{n:>8} {mode:<10} {result['peak_mb']:>8.0f}MB {n/result['elapsed']:>10.1f} {result['elapsed']:>8.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Run the backtests of a job file without the app.
+
+    python -m dca_simulator job.yaml [-o results.parquet] [--workers 4] [--profile run.prof]
+
+See dca_simulator.jobs.load_job for the job file format.
+"""
+import argparse
+import contextlib
+import logging
+import sys
+import time
+
+from .jobs import load_job, run_job, run_universe_job, write_results
+from .timing import profile
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dca_simulator", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("job", help="job file (.yaml, .yml or .json)")
+    parser.add_argument("-o", "--output", help="results file (.parquet or .csv), overrides the job's output")
+    parser.add_argument("--workers", type=int, help="backtest processes (default: the job's max_workers, or every CPU)")
+    parser.add_argument("--profile", help="write a profile of the run: cProfile stats (.prof), or a pyinstrument report (.html); "
+                                          "use --workers 1 to include the backtests")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    job = load_job(args.job)
+    output = args.output or job.get("output") or "results.csv"
+
+    start = time.perf_counter()
+    if job.get("universe"): #streamed to the output batch by batch
+        def progress(done, total):
+            logging.getLogger("dca_simulator").info("%d/%d tickers", done, total)
+
+        with profile(args.profile) if args.profile else contextlib.nullcontext():
+            rows = run_universe_job(job, output, max_workers=args.workers, progress=progress)
+        print(f"{rows} runs in {time.perf_counter() - start:.1f}s -> {output}")
+        return 0 if rows else 1
+
+    errors = {}
+    with profile(args.profile) if args.profile else contextlib.nullcontext():
+        results = run_job(job, max_workers=args.workers, errors=errors)
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        skipped = [f"{label} {first} - {last or 'today'} ({reason})" for (label, first, last), reason in errors.items()]
+        print(f"Skipped: {', '.join(skipped)}", file=sys.stderr)
+    if results.empty:
+        print("No results", file=sys.stderr)
+        return 1
+
+    write_results(results, output)
+    print(f"{len(results)} runs in {elapsed:.1f}s -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,162 @@
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from .indicators import IndicatorCache
+from .kernels import simulate_targets_batch
+from .timing import span
 
-def perf_backtest(df: pd.DataFrame, strategy, **strategy_kwargs):
-    """Function to perform a certain strategy"""
 
-    result = strategy(df, **strategy_kwargs)
-    return result
+TRADING_DAYS_PER_MONTH = 21 #monthly price paths approximate daily windows with month starts
+
+
+class Strategy:
+    """A monthly contribution rule.
+
+    A strategy only decides how much to invest each month, the accounting (shares, invested
+    capital, portfolio value, profit/loss) is done by the shared kernel in run_backtest.
+    Subclasses implement contributions(), or targets() for rules that aim at a portfolio value.
+    """
+
+    name = "Strategy"
+    lookback = 0 #daily bars of history signals() needs for the last bar (rolling windows)
+    #False: the amount of a month only depends on its own row, so contributions() of some rows are those
+    #rows' amounts (live states compute appended months alone); True: appending months changes past amounts
+    horizon_dependent = False
+
+    def signals(self, df: pd.DataFrame, indicators: IndicatorCache) -> dict:
+        """Daily indicator series ({column: Series}) the rule needs; they are sampled on the
+        first trading day of each month and kept as columns of the output frame.
+        Rolling statistics should come from indicators so strategies of one run share them."""
+        return {}
+
+    def contributions(self, monthly: pd.DataFrame) -> np.ndarray:
+        """Amount to invest on each row of the monthly frame (0 = skip the month)"""
+        raise NotImplementedError
+
+    def contributions_batch(self, paths: np.ndarray) -> np.ndarray:
+        """Amounts to invest on a batch of month-start price paths, shape (n_paths, n_months), for
+        Monte Carlo simulations. Daily signals do not exist on a monthly path, so a rule that uses
+        them overrides this with its monthly equivalent; the default runs contributions() path by path."""
+
+        if type(self).signals is not Strategy.signals:
+            raise NotImplementedError(f"{self.name} has daily signals and no monthly rule for price paths")
+        return np.array([self.contributions(_path_frame(path)) for path in paths], dtype=float).reshape(paths.shape)
+
+    def run(self, df: pd.DataFrame, indicators: IndicatorCache | None = None) -> pd.DataFrame:
+        return run_backtest(self, df, indicators)
+
+
+class TargetValueStrategy(Strategy):
+    """A path dependent rule: each month the portfolio is topped up to a target value
+    (never sold down), so the contribution depends on the value reached so far."""
+
+    def targets(self, monthly: pd.DataFrame, first_month: int = 0) -> np.ndarray:
+        """Target portfolio value on each row of the monthly frame, whose first row is month
+        first_month of the run (a live state asks for the months it appends)"""
+        raise NotImplementedError
+
+    def targets_batch(self, paths: np.ndarray) -> np.ndarray:
+        """Target values on a batch of month-start price paths, shape (n_paths, n_months) or (n_months,)
+        for every path (see contributions_batch)"""
+
+        if type(self).signals is not Strategy.signals:
+            raise NotImplementedError(f"{self.name} has daily signals and no monthly rule for price paths")
+        return np.array([self.targets(_path_frame(path)) for path in paths], dtype=float).reshape(paths.shape)
+
+
+def _path_frame(path: np.ndarray) -> pd.DataFrame:
+    """Monthly frame of one synthetic price path (no dates, rows are months)"""
+    return pd.DataFrame({"Close": path}, index=pd.RangeIndex(len(path), name="month"))
+
+
+def trailing(paths: np.ndarray, window: int, reduce) -> np.ndarray:
+    """reduce over the last `window` months of each path (current month included), NaN while the
+    window is incomplete: the monthly equivalent of a rolling indicator"""
+
+    out = np.full(paths.shape, np.nan)
+    if window <= paths.shape[1]:
+        out[:, window - 1:] = reduce(sliding_window_view(paths, window, axis=1), axis=2)
+    return out
+
 
+def monthly_frame(df: pd.DataFrame, signals: dict | None = None, indicators: IndicatorCache | None = None) -> pd.DataFrame:
+    """First trading day of each month (if we specify an exact date manually it could be a non-trading day),
+    with the signal columns sampled the same way. df itself is not copied or modified."""
 
+    monthly = indicators.monthly_first(df) if indicators is not None else df.resample("MS").first()
+    if signals:
+        sampled = pd.DataFrame(signals, index=df.index).resample("MS").first()
+        return pd.concat([monthly, sampled], axis=1)
+    return monthly.copy() #the cached resample is shared, the caller adds columns
 
 
+def simulate(close: np.ndarray, contributions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized accounting for a contribution vector: (shares_total, invested_total, portf_value)"""
 
+    close = np.asarray(close, dtype=float)
+    contributions = np.asarray(contributions, dtype=float)
+
+    #months without a contribution must not touch shares_total, even when the price is missing
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares_bought = np.where(contributions != 0, contributions/close, 0.0)
+
+    shares_total = np.cumsum(shares_bought) #np.cumsum adds sequentially, so this matches a running total
+    invested_total = np.cumsum(contributions)
+    return shares_total, invested_total, shares_total*close
+
+
+def simulate_batch(strategy: Strategy, paths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Accounting of a strategy on a batch of month-start price paths: (shares_total, invested_total),
+    shaped like paths (see Strategy.contributions_batch)"""
+
+    if isinstance(strategy, TargetValueStrategy):
+        return simulate_targets_batch(paths, strategy.targets_batch(paths))
+    contributions = strategy.contributions_batch(paths)
+    return np.cumsum(contributions/paths, axis=1), np.cumsum(contributions, axis=1)
+
+
+def simulate_targets(close: np.ndarray, targets: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Accounting for a target value path: invest max(target - current value, 0) each month.
+    Every month depends on the shares bought before, so the months are walked in order by
+    the compiled kernel of kernels.py (or its NumPy fallback). A NaN price invests nothing."""
+
+    close = np.asarray(close, dtype=float)
+    shares, invested = simulate_targets_batch(close, targets)
+    return shares, invested, shares*close
+
+
+def run_backtest(strategy: Strategy, df: pd.DataFrame, indicators: IndicatorCache | None = None) -> pd.DataFrame:
+    """Shared kernel: build the monthly frame once, ask the strategy for its contributions
+    (or targets) and add shares_total, invested_total, portf_value and profit_loss.
+    Pass the same indicators cache to every strategy of a run to compute rolling windows
+    and the monthly resample only once."""
+
+    if indicators is None:
+        indicators = IndicatorCache()
+    with span(f"strategy:{strategy.name}"):
+        monthly_investments = monthly_frame(df, strategy.signals(df, indicators), indicators)
+        close = monthly_investments["Close"].to_numpy(dtype=float)
+
+        if isinstance(strategy, TargetValueStrategy):
+            shares_total, invested_total, portf_value = simulate_targets(close, strategy.targets(monthly_investments))
+        else:
+            shares_total, invested_total, portf_value = simulate(close, strategy.contributions(monthly_investments))
+
+        monthly_investments["shares_total"] = shares_total
+        monthly_investments["invested_total"] = invested_total
+        monthly_investments["portf_value"] = portf_value
+
+        #Profit/Loss
+        monthly_investments["profit_loss"] = monthly_investments["portf_value"] - monthly_investments["invested_total"]
+
+    return monthly_investments
+
+
+def perf_backtest(df: pd.DataFrame, strategy, **strategy_kwargs):
+    """Function to perform a certain strategy, given as a Strategy object or a strategy function"""
+
+    if isinstance(strategy, Strategy):
+        return run_backtest(strategy, df, strategy_kwargs.get("indicators"))
+
+    result = strategy(df, **strategy_kwargs)
+    return result
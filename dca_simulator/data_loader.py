@@ -1,13 +1,26 @@
+import os
+import time
+import logging
+import contextvars
+import numpy as np
 import pandas as pd
-import yfinance as yf
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .data_processing import data_process
+from .file_source import FileSource
+from .price_cache import PriceCache
+from .price_store import PriceStore
+from .timing import span
 
-def load_price_data(ticker: str, start_date: str, end_date: str | None = None):
-    if end_date == "" or end_date is None:
-        end_date = dt.date.today().strftime("%Y-%m-%d")
+logger = logging.getLogger(__name__)
+
+def yf_download(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Default downloader: daily auto-adjusted closes from Yahoo Finance (end_date exclusive)"""
 
-    df = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=True)
+    import yfinance as yf #slow to import, only needed when something has to be downloaded
+
+    #Ticker.history keeps its state per object, yf.download shares module globals and is not thread safe
+    df = yf.Ticker(ticker).history(start=start_date, end=end_date, auto_adjust=True)
 
     if df is None or df.empty:
         return pd.DataFrame()
@@ -19,43 +32,163 @@ def load_price_data(ticker: str, start_date: str, end_date: str | None = None):
         return pd.DataFrame()
 
     df = df[["Close"]]
-    df = data_process(df)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None) #naive dates, like yf.download
+    df.index.name = "Date"
     return df
 
 
+#shared by every caller of load_price_data, set DCA_SIMULATOR_OFFLINE=1 to never touch the network
+_price_cache = PriceCache(downloader=yf_download, offline=os.environ.get("DCA_SIMULATOR_OFFLINE") == "1")
+
+def get_price_cache() -> PriceCache | None:
+    return _price_cache
+
+def set_price_cache(cache: PriceCache | None):
+    """Replace the default price cache, None downloads on every call.
+    The price store is cleared since it was filled from the previous cache."""
+    global _price_cache
+    _price_cache = cache
+    if _price_store is not None:
+        _price_store.clear()
+
+
+#in-memory closes shared by every session of the app process, in front of the price cache
+_price_store = PriceStore(max_bytes=256*1024**2)
+
+def get_price_store() -> PriceStore | None:
+    return _price_store
+
+def set_price_store(store: PriceStore | None):
+    """Replace the shared price store, None loads from the price cache on every call"""
+    global _price_store
+    _price_store = store
 
 
+#local price archive (directory of per-ticker files, or one wide file) read instead of the price cache
+#and the network for the tickers it has, e.g. DCA_SIMULATOR_DATA_DIR=~/prices
+_file_source = FileSource(os.path.expanduser(os.environ["DCA_SIMULATOR_DATA_DIR"])) if os.environ.get("DCA_SIMULATOR_DATA_DIR") else None
 
-def load_multiple_price_data(tickers: list[str], start_date: str, end_date: str | None = None) -> pd.DataFrame | None:
-    dfs = []
+def get_file_source() -> FileSource | None:
+    return _file_source
 
-    for ticker in tickers:
+def set_file_source(source: FileSource | str | None):
+    """Read the tickers found in a local archive (a FileSource or its path) from it, None downloads
+    everything. The price store is cleared since it may hold closes of the previous source."""
+    global _file_source
+    _file_source = FileSource(source) if isinstance(source, str) else source
+    if _price_store is not None:
+        _price_store.clear()
+
+
+
+def load_price_data(ticker: str, start_date: str, end_date: str | None = None, cache: PriceCache | None = None, downloader=None):
+    """Load daily closes for ticker through the shared price store and the local file source (see
+    set_file_source) or the price cache (or the downloader directly if caching is disabled).
+    The returned frame may share read-only arrays with other callers.
+    An explicit cache or downloader bypasses the store and the file source."""
+    if end_date == "" or end_date is None:
+        end_date = dt.date.today().strftime("%Y-%m-%d")
+
+    if cache is None and downloader is None and _price_store is not None:
+        return _price_store.get(ticker, start_date, end_date, _load_from_source)
+    return _load_from_source(ticker, start_date, end_date, cache, downloader)
+
+
+def _load_from_source(ticker: str, start_date: str, end_date: str, cache: PriceCache | None = None, downloader=None) -> pd.DataFrame:
+    source = _file_source
+    if cache is None and downloader is None and source is not None and ticker in source:
+        with span("read", ticker=ticker):
+            df = data_process(source.read(ticker, start_date, end_date)) #wide files: NaN before listing
+        return df if not df.empty else pd.DataFrame()
+
+    cache = cache if cache is not None else _price_cache
+    with span("download", ticker=ticker):
+        if cache is None:
+            df = (downloader or yf_download)(ticker, start_date, end_date)
+        else:
+            df = cache.get(ticker, start_date, end_date, downloader=downloader)
+
+    if df is None or df.empty or "Close" not in df.columns:
+        return pd.DataFrame()
+
+    df = df[["Close"]]
+    df = data_process(df)
+    return df
+
+
+
+
+def _load_with_retry(ticker: str, start_date: str, end_date: str | None, retries: int, backoff: float, **load_kwargs) -> pd.DataFrame:
+    """load_price_data with exponential backoff, for transient errors such as rate limits"""
+    for attempt in range(retries + 1):
         try:
-            df = load_price_data(ticker, start_date, end_date)
-            if df.empty:
-                continue
+            return load_price_data(ticker, start_date, end_date, **load_kwargs)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            logger.info("Retrying %s after error: %s", ticker, e)
+            time.sleep(backoff*2**attempt)
+
+
 
-            df = df.reset_index()
-            if "Date" not in df.columns:
-                df = df.rename(columns={df.columns[0]: "Date"})
+def load_multiple_price_data(tickers: list[str], start_date: str, end_date: str | None = None, max_workers: int = 8,
+                             retries: int = 2, backoff: float = 0.5, errors: dict | None = None,
+                             cache: PriceCache | None = None, downloader=None, progress=None) -> pd.DataFrame | None:
+    """Load several tickers concurrently (max_workers threads) and align them on Date.
+    Tickers that fail after the retries, or return no data, are skipped and reported in errors (ticker -> message).
+    progress(done, total, ticker) is called as each ticker finishes loading (or fails), in completion order"""
 
-            df = df[["Date", "Close"]].rename(columns={"Close": ticker})
-            dfs.append(df)
+    tickers = list(dict.fromkeys(tickers)) #drop duplicates, keep order
+    if errors is None:
+        errors = {}
 
+    def load_one(ticker):
+        return _load_with_retry(ticker, start_date, end_date, retries, backoff, cache=cache, downloader=downloader)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers) or 1))) as pool:
+        #each thread runs in a copy of the caller's context, so timing spans reach the caller's collector
+        futures = {ticker: pool.submit(contextvars.copy_context().run, load_one, ticker) for ticker in tickers}
+        if progress is not None:
+            names = {future: ticker for ticker, future in futures.items()}
+            for done, future in enumerate(as_completed(names), 1):
+                progress(done, len(names), names[future])
+
+    prices = []
+    for ticker, future in futures.items(): #iterate in the requested order, not completion order
+        try:
+            df = future.result()
         except Exception as e:
-            print(f"Error loading data for {ticker}: {e}")
+            errors[ticker] = str(e)
+            logger.warning("Error loading data for %s: %s", ticker, e)
+            continue
+
+        if df.empty:
+            errors[ticker] = "no data"
+            logger.warning("No data found for %s", ticker)
+            continue
+
+        prices.append(df["Close"].rename(ticker))
 
-    if not dfs:
+    if not prices:
         return None
 
-    merged_df = dfs[0]
-    for d in dfs[1:]:
-        merged_df = pd.merge(merged_df, d, on="Date", how="outer")
+    return _align_prices(prices)
+
+
+
+def _align_prices(prices: list[pd.Series]) -> pd.DataFrame:
+    """Align per-ticker close series on the union of their dates in one pre-allocated 2-D array
+    (instead of one outer merge per ticker, which copies the growing frame every time)"""
+
+    dates = pd.DatetimeIndex(np.unique(np.concatenate([p.index.values for p in prices])), name="Date")
+
+    values = np.full((len(dates), len(prices)), np.nan)
+    for j, p in enumerate(prices):
+        values[dates.searchsorted(p.index.values), j] = p.to_numpy(dtype=float)
 
-    merged_df = merged_df.sort_values("Date")
-    price_cols = [c for c in merged_df.columns if c != "Date"]
-    merged_df[price_cols] = merged_df[price_cols].ffill()
+    merged_df = pd.DataFrame(values, index=dates, columns=[p.name for p in prices]).ffill()
 
-    merged_df["Portfolio"] = merged_df[price_cols].mean(axis=1) # create portfolio as average of all tickers
+    merged_df["Portfolio"] = merged_df.mean(axis=1) # create portfolio as average of all tickers
+    merged_df = merged_df.reset_index()
     return merged_df
-    
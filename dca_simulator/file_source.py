@@ -0,0 +1,207 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+#file extension -> format
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+
+class FileSource:
+    """Local price archive read instead of downloading: either a directory with one file per ticker
+    (AAPL.csv, MSFT.parquet, NVDA.arrow, ...: a date column and a close column, e.g. written by
+    load_price_data(...).to_csv()), or one wide file (a date column and one close column per ticker).
+
+    Only the requested columns and dates are read where the format allows it:
+      - Parquet: column subset, and row groups outside the dates are skipped (pyarrow filters);
+      - Arrow IPC / Feather (uncompressed): the file is memory-mapped and sliced, nothing is copied
+        but the dates and the returned slice;
+      - CSV: column subset only (CSV cannot be sliced without parsing); a wide CSV is parsed once
+        and kept in memory until it changes, or with cache=False parsed on every read keeping only
+        the requested columns. Convert large archives to Parquet or Arrow.
+    Parquet and Arrow need pyarrow.
+
+    Dates are half-open [start_date, end_date) like the downloaders, and a FileSource is itself
+    callable as a downloader: source(ticker, start_date, end_date).
+    """
+
+    def __init__(self, path: str, date_column: str = "Date", close_column: str = "Close", cache: bool = True):
+        self.path = path
+        self.date_column = date_column
+        self.close_column = close_column
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._wide_csv = None #(mtime, DataFrame) of a wide CSV
+        if os.path.isdir(path):
+            self.wide = False
+            self._scan()
+        elif os.path.isfile(path):
+            if _format(path) is None:
+                raise ValueError(f"{path}: unsupported file type (supported: {', '.join(FORMATS)})")
+            self.wide = True
+            self._columns = [c for c in _columns(path) if c != date_column]
+            self._by_upper = {} #case-insensitive lookup, like the files of a directory
+            for column in self._columns:
+                self._by_upper.setdefault(column.upper(), column)
+        else:
+            raise FileNotFoundError(path)
+
+    def _scan(self):
+        """Index the directory's price files by upper case ticker"""
+        files = {}
+        for name in sorted(os.listdir(self.path)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in FORMATS and stem.upper() not in files: #AAPL.parquet and AAPL.csv: the first one
+                files[stem.upper()] = os.path.join(self.path, name)
+        with self._lock:
+            self._files = files
+
+    def tickers(self) -> list[str]:
+        return list(self._columns) if self.wide else list(self._files)
+
+    def __contains__(self, ticker: str) -> bool:
+        if self.wide:
+            return ticker.upper() in self._by_upper
+        if ticker.upper() not in self._files:
+            self._scan() #files added since
+        return ticker.upper() in self._files
+
+    def __call__(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+        return self.read(ticker, start_date, end_date)
+
+    def read(self, ticker: str, start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+        """Daily closes of ticker in [start_date, end_date) as a DataFrame with a "Close" column and a
+        DatetimeIndex named Date (empty if the archive has no rows in that range)"""
+
+        if ticker not in self:
+            raise KeyError(f"{ticker} is not in {self.path}")
+        if self.wide:
+            return self.read_many([ticker], start_date, end_date).rename(columns={ticker: "Close"})
+
+        path = self._files[ticker.upper()]
+        columns = [c for c in _columns(path) if c != self.date_column]
+        column = self.close_column if self.close_column in columns or len(columns) != 1 else columns[0]
+        return _read(path, self.date_column, [column], start_date, end_date).rename(columns={column: "Close"})
+
+    def read_many(self, tickers: list[str], start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+        """Closes of several tickers, one column each, on the union of their dates (not filled)"""
+
+        missing = [ticker for ticker in tickers if ticker not in self]
+        if missing:
+            raise KeyError(f"{', '.join(missing)} not in {self.path}")
+        if not self.wide:
+            return pd.concat([self.read(ticker, start_date, end_date)["Close"].rename(ticker) for ticker in tickers], axis=1)
+
+        columns = [self._by_upper[ticker.upper()] for ticker in tickers]
+        if _format(self.path) == "csv" and self.cache:
+            df = _slice(self._read_wide_csv()[columns], start_date, end_date)
+        else:
+            df = _read(self.path, self.date_column, list(dict.fromkeys(columns)), start_date, end_date)[columns]
+        df.columns = list(tickers) #named as requested
+        return df
+
+    def _read_wide_csv(self) -> pd.DataFrame:
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if self._wide_csv is None or self._wide_csv[0] != mtime:
+                self._wide_csv = (mtime, _read_csv(self.path, self.date_column, None))
+            return self._wide_csv[1]
+
+
+def _format(path: str) -> str | None:
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _columns(path: str) -> list[str]:
+    """Column names without reading the data"""
+
+    fmt = _format(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(_open_arrow(path).schema.names)
+
+
+def _open_arrow(path: str):
+    """Memory-mapped Arrow IPC file (Feather v2) or stream"""
+
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    source = pa.memory_map(path, "r")
+    try:
+        return ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return ipc.open_stream(source).read_all()
+
+
+def _read(path: str, date_column: str, columns: list[str], start_date, end_date) -> pd.DataFrame:
+    fmt = _format(path)
+    if fmt == "csv":
+        return _slice(_read_csv(path, date_column, columns), start_date, end_date)
+
+    import pyarrow as pa
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        filters = []
+        field = pq.read_schema(path).field(date_column).type
+        if pa.types.is_timestamp(field): #row group statistics are comparable
+            #the dates are local, so are the bounds of a time zone aware column
+            bound = lambda date: pd.Timestamp(date).tz_localize(field.tz) if field.tz else pd.Timestamp(date)
+            if start_date is not None:
+                filters.append((date_column, ">=", bound(start_date)))
+            if end_date is not None:
+                filters.append((date_column, "<", bound(end_date)))
+        table = pq.read_table(path, columns=[date_column, *columns], filters=filters or None, memory_map=True)
+    else:
+        table = _open_arrow(path).select([date_column, *columns])
+
+    column = table.column(date_column)
+    dates = column.to_numpy() #UTC instants for a time zone aware column
+    if pa.types.is_timestamp(column.type) and column.type.tz:
+        dates = pd.DatetimeIndex(dates).tz_localize("UTC").tz_convert(column.type.tz)
+    dates = pd.DatetimeIndex(_local_dates(dates), name="Date")
+    if dates.is_monotonic_increasing: #slice before converting, so only the requested rows are copied
+        lo = dates.searchsorted(pd.Timestamp(start_date)) if start_date is not None else 0
+        hi = dates.searchsorted(pd.Timestamp(end_date)) if end_date is not None else len(dates)
+        table, dates = table.slice(lo, hi - lo), dates[lo:hi]
+    values = {column: table.column(column).to_numpy().astype(float, copy=False) for column in columns}
+    return _slice(pd.DataFrame(values, index=dates), start_date, end_date)
+
+
+def _read_csv(path: str, date_column: str, columns: list[str] | None) -> pd.DataFrame:
+    usecols = None if columns is None else [date_column, *columns]
+    df = pd.read_csv(path, usecols=usecols, index_col=date_column)
+    df.index = pd.DatetimeIndex(_local_dates(df.index), name="Date")
+    return df.astype(float)
+
+
+def _local_dates(values) -> pd.DatetimeIndex:
+    """Naive dates at their local wall time, the loaders work on naive dates: a time zone or UTC offset
+    (yfinance exports carry one) is dropped, including offsets that change within the column, e.g.
+    -05:00 then -04:00 across daylight saving time"""
+
+    parsed = isinstance(values, pd.DatetimeIndex) or (isinstance(values, np.ndarray) and values.dtype.kind == "M")
+    try:
+        dates = pd.DatetimeIndex(values if parsed else pd.to_datetime(values))
+    except ValueError: #mixed offsets, pandas only parses them as UTC instants
+        text = pd.Index(values).astype(str)
+        dates = pd.DatetimeIndex(pd.to_datetime(text, utc=True))
+        #add each row's own offset back to get its wall time
+        offset = text.str.extract(r"([+-])(\d{2}):?(\d{2})$")
+        minutes = offset[1].astype(float)*60 + offset[2].astype(float)
+        minutes = minutes.where(offset[0] == "+", -minutes).fillna(0).to_numpy()
+        return (dates + pd.to_timedelta(minutes, unit="min")).tz_localize(None)
+    return dates.tz_localize(None) if dates.tz is not None else dates
+
+
+def _slice(df: pd.DataFrame, start_date, end_date) -> pd.DataFrame:
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    lo = df.index.searchsorted(pd.Timestamp(start_date)) if start_date is not None else 0
+    hi = df.index.searchsorted(pd.Timestamp(end_date)) if end_date is not None else len(df)
+    return df.iloc[lo:hi]
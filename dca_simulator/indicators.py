@@ -0,0 +1,50 @@
+import pandas as pd
+
+
+class IndicatorCache:
+    """Per-run cache of derived series shared by the strategies of one simulation.
+
+    Entries are keyed by (frame identity, column, indicator, window). The frame itself is
+    kept alive by the cache so its id cannot be reused while the cache exists; use one
+    cache per run (price frame), not a long lived global one.
+    hits / misses count lookups, see stats().
+    """
+
+    def __init__(self):
+        self._store = {}
+        self._frames = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df: pd.DataFrame, column: str | None, indicator: str, window, compute):
+        """Cached compute() for (df, column, indicator, window)"""
+
+        key = (id(df), column, indicator, window)
+        if key in self._store:
+            self.hits += 1
+            return self._store[key]
+
+        self.misses += 1
+        value = compute()
+        self._frames[id(df)] = df
+        self._store[key] = value
+        return value
+
+    def rolling_max(self, df: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self.get(df, column, "rolling_max", window, lambda: df[column].rolling(window).max())
+
+    def rolling_mean(self, df: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self.get(df, column, "rolling_mean", window, lambda: df[column].rolling(window).mean())
+
+    def monthly_first(self, df: pd.DataFrame) -> pd.DataFrame:
+        """df.resample("MS").first(); treat the result as read-only"""
+        return self.get(df, None, "monthly_first", "MS", lambda: df.resample("MS").first())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._store),
+            "hit_rate": self.hits/lookups if lookups else 0.0,
+        }
@@ -0,0 +1,211 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check() in a job that was superseded by a newer one"""
+
+
+class Job:
+    """One unit of background work: fn(job) runs on a WorkerPool thread.
+
+    Cancellation is cooperative: a running job calls job.check() between its steps (which
+    raises JobCancelled once it was superseded) and skips its UI updates if job.cancelled.
+    """
+
+    def __init__(self, kind: str, key, fn):
+        self.kind = kind
+        self.key = key
+        self.fn = fn
+        self.context = contextvars.copy_context() #runs with the submitter's context (e.g. Panel's current document)
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Stop here if the job was cancelled"""
+        if self.cancelled:
+            raise JobCancelled(self.kind)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class WorkerPool:
+    """Bounded thread pool shared by every session of the process, with queue metrics.
+
+    Jobs wait in the pool's queue when all max_workers threads are busy. stats() reports the
+    queue depth, the number of running jobs, counters, and wait / run latency percentiles
+    over the last `window` jobs.
+    """
+
+    def __init__(self, max_workers: int = 4, window: int = 500):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dca-job")
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self._runs = deque(maxlen=window)
+        self.queued = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.deduplicated = 0
+
+    def submit(self, job: Job, on_done=None):
+        """Run job.fn(job) on a pool thread, then on_done(job) (also for jobs cancelled before they started)"""
+
+        with self._lock:
+            self.submitted += 1
+            self.queued += 1
+        self._executor.submit(self._run, job, on_done)
+
+    def _run(self, job: Job, on_done):
+        job.started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self._waits.append(job.started_at - job.submitted_at)
+
+        try:
+            if not job.cancelled:
+                job.context.run(job.fn, job)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished_at = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                if job.cancelled:
+                    self.cancelled += 1
+                elif job.error is not None:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                    self._runs.append(job.finished_at - job.started_at)
+            job._done.set()
+            if on_done is not None:
+                on_done(job)
+
+    def count(self, counter: str, n: int = 1):
+        """Increment one of the counters, for jobs handled outside the pool (deduplicated, dropped)"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = np.array(self._waits)
+            runs = np.array(self._runs)
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "deduplicated": self.deduplicated,
+                "wait_p50": float(np.median(waits)) if len(waits) else 0.0,
+                "wait_p95": float(np.percentile(waits, 95)) if len(waits) else 0.0,
+                "run_p50": float(np.median(runs)) if len(runs) else 0.0,
+                "run_p95": float(np.percentile(runs, 95)) if len(runs) else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class SessionQueue:
+    """Per-session job queue in front of a shared WorkerPool.
+
+    A session runs one job at a time, in submission order, so its jobs never race on the
+    same widgets; other sessions use the remaining pool threads.
+
+    submit(kind, key, fn):
+      - a job with the same key that is queued or running is returned instead of a new one
+        (identical requests, e.g. double clicks, run once);
+      - otherwise queued jobs of the same kind are dropped and a running one is cancelled,
+        since only the latest preview / simulation of a session is displayed.
+    """
+
+    def __init__(self, pool: WorkerPool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._running = None
+
+    def submit(self, kind: str, key, fn) -> Job:
+        with self._lock:
+            for job in (self._running, *self._pending):
+                if job is not None and job.key == key and not job.cancelled:
+                    self.pool.count("deduplicated")
+                    return job
+
+            for job in [job for job in self._pending if job.kind == kind]:
+                self._pending.remove(job)
+                self._drop(job)
+            if self._running is not None and self._running.kind == kind:
+                self._running.cancel()
+
+            job = Job(kind, key, fn)
+            self._pending.append(job)
+            self._start_next()
+        return job
+
+    def _drop(self, job: Job):
+        """Cancel a job that never reached the pool"""
+        job.cancel()
+        job._done.set()
+        self.pool.count("cancelled")
+
+    def _start_next(self):
+        if self._running is None and self._pending:
+            self._running = self._pending.popleft()
+            self.pool.submit(self._running, self._finished)
+
+    def _finished(self, job: Job):
+        with self._lock:
+            if self._running is job:
+                self._running = None
+            self._start_next()
+
+    def depth(self) -> int:
+        """Jobs of this session that are queued or running"""
+        with self._lock:
+            return len(self._pending) + (self._running is not None)
+
+    def cancel_all(self):
+        with self._lock:
+            if self._running is not None:
+                self._running.cancel()
+            while self._pending:
+                self._drop(self._pending.popleft())
+
+
+#shared by every session of the app process
+_default_pool = WorkerPool(max_workers=4)
+
+def get_worker_pool() -> WorkerPool:
+    return _default_pool
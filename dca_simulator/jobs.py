@@ -0,0 +1,239 @@
+import inspect
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import yaml
+
+from .data_loader import load_price_data, load_multiple_price_data
+from .indicators import IndicatorCache
+from .metrics import KEY_METRICS_DTYPE, key_metrics
+from .portfolio import REBALANCE_MONTHS, WEIGHTINGS, portfolio_index
+from .runner import stream_universe
+from .strategies import STRATEGIES, run_strategy
+
+logger = logging.getLogger(__name__)
+
+#strategy parameters a job can set or sweep, one output column each (NaN for strategies that do not use it)
+PARAMETERS = ("monthly_contrib", "DD_threshold", "sma_period", "goal_monthly_growth")
+RESULT_COLUMNS = ["ticker", "start", "end", "strategy", *PARAMETERS, *KEY_METRICS_DTYPE.names]
+
+
+def load_job(path: str) -> dict:
+    """Read a job file (.yaml/.yml or .json), for example:
+
+        tickers: [AAPL, MSFT, [AAPL, MSFT, NVDA]]   # a list is a portfolio (see weighting)
+        periods:
+          - {start: 2000-01-01, end: 2020-01-01}
+          - {start: 2010-01-01}                     # no end: up to today
+        strategies: [DCA, Double Down DCA]          # default: every strategy
+        params:                                     # a list is a grid, every combination is run
+          monthly_contrib: [150, 500]
+          DD_threshold: [0.1, 0.15, 0.2]
+          sma_period: 90
+        weighting: equal                            # portfolios: equal, market_cap, price or {AAPL: 0.5, MSFT: 0.5}
+        rebalance: monthly                          # portfolios: monthly, quarterly, yearly or never
+        output: results.csv                         # .csv or .parquet
+        max_workers: 4
+
+    A single period can also be given as top-level start / end keys. market_caps ({ticker:
+    capitalization}) sets the starting capitalizations of the market_cap weighting; without it,
+    market_cap starts every ticker at the same weight and lets the weights drift with the prices.
+
+    A universe job backtests a local price archive too large for memory (see run_universe_job):
+
+        universe: ~/prices                          # folder with a file per ticker, or a wide file
+        tickers: [AAPL, MSFT]                       # optional, default: every ticker of the archive
+        start: 2000-01-01
+        params: {monthly_contrib: 150}              # single values
+        batch_size: 200
+        output: universe.parquet
+    """
+
+    with open(path) as f:
+        job = yaml.safe_load(f) if path.endswith((".yaml", ".yml")) else json.load(f)
+    if not isinstance(job, dict):
+        raise ValueError(f"{path}: a job file must contain a mapping")
+    return job
+
+
+def _periods(job: dict) -> list[tuple[str, str | None]]:
+    periods = job.get("periods") or [{"start": job.get("start"), "end": job.get("end")}]
+    result = []
+    for period in periods:
+        if not period.get("start"):
+            raise ValueError("every period needs a start date")
+        end = period.get("end")
+        #YAML parses unquoted dates as datetime.date
+        result.append((str(period["start"]), str(end) if end else None))
+    return result
+
+
+def param_grid(strategy: str, params: dict) -> list[dict]:
+    """Every combination of the (list valued) params the strategy accepts; params it ignores
+    are not expanded, so DCA is not re-run for every Double Down threshold."""
+
+    accepted = inspect.signature(STRATEGIES[strategy]).parameters
+    keys = [key for key in params if key in accepted]
+    values = [params[key] if isinstance(params[key], list) else [params[key]] for key in keys]
+    return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+
+def expand_job(job: dict) -> list[tuple]:
+    """Units of work: (ticker label, tickers, start, end, [(strategy, params), ...])"""
+
+    tickers = job.get("tickers") or []
+    if not tickers:
+        raise ValueError("the job has no tickers")
+    strategies = job.get("strategies") or list(STRATEGIES)
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"unknown strategies: {', '.join(unknown)} (available: {', '.join(STRATEGIES)})")
+    params = job.get("params") or {}
+    unknown = [key for key in params if key not in PARAMETERS]
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(unknown)} (available: {', '.join(PARAMETERS)})")
+
+    runs = [(name, combination) for name in strategies for combination in param_grid(name, params)]
+    units = []
+    for start, end in _periods(job):
+        for entry in tickers:
+            group = [entry] if isinstance(entry, str) else list(entry)
+            units.append(("+".join(group), group, start, end, runs))
+    return units
+
+
+def portfolio_options(job: dict) -> dict:
+    """portfolio_index keyword arguments of the job's weighting / rebalance / market_caps keys"""
+
+    weighting = job.get("weighting", "equal")
+    caps = job.get("market_caps")
+    options = {"rebalance": job.get("rebalance", "monthly"),
+               "market_caps": {ticker.upper(): float(cap) for ticker, cap in caps.items()} if caps else None}
+    if isinstance(weighting, dict):
+        options.update(weighting="custom", weights={ticker.upper(): float(w) for ticker, w in weighting.items()})
+    else:
+        options["weighting"] = weighting
+    if options["weighting"] not in WEIGHTINGS:
+        raise ValueError(f"unknown weighting: {weighting} (available: {', '.join(WEIGHTINGS)}, or {{ticker: weight}})")
+    if options["rebalance"] not in REBALANCE_MONTHS:
+        raise ValueError(f"unknown rebalance: {options['rebalance']} (available: {', '.join(REBALANCE_MONTHS)})")
+    return options
+
+
+def _load_unit(tickers: list[str], start: str, end: str | None, portfolio: dict | None = None) -> pd.DataFrame | None:
+    """Close prices of one ticker, or the unit value of a portfolio of several (portfolio: portfolio_index options).
+    A portfolio with a ticker that cannot be loaded raises ValueError rather than running without it."""
+
+    if len(tickers) == 1:
+        return load_price_data(tickers[0], start, end)
+    failed = {}
+    merged = load_multiple_price_data(tickers, start, end, errors=failed)
+    if failed:
+        raise ValueError(", ".join(f"{ticker}: {reason}" for ticker, reason in failed.items()))
+    if merged is None or merged.empty:
+        return None
+    portfolio = dict(portfolio or {})
+    if portfolio.get("weights"): #custom weights may cover the tickers of several portfolios
+        portfolio["weights"] = {ticker: w for ticker, w in portfolio["weights"].items() if ticker in merged.columns}
+    return portfolio_index(merged, **portfolio).to_frame()
+
+
+def _run_unit(label: str, start: str, end: str | None, df: pd.DataFrame, runs: list) -> list[dict]:
+    """Every (strategy, params) run on one price frame, one row each"""
+
+    indicators = IndicatorCache() #rolling windows shared by the runs of this frame
+    rows = []
+    for name, params in runs:
+        metrics = key_metrics(run_strategy(name, df, indicators=indicators, **params))
+        row = {"ticker": label, "start": start, "end": end, "strategy": name}
+        row.update(params)
+        row.update({field: float(metrics[field]) for field in KEY_METRICS_DTYPE.names})
+        rows.append(row)
+    return rows
+
+
+def run_job(job: dict, max_workers: int | None = None, errors: dict | None = None) -> pd.DataFrame:
+    """Run a job (see load_job) and return one row per (ticker, period, strategy, parameter combination)
+    with the key_metrics fields.
+
+    Prices are loaded on a thread pool (through the price cache), the backtests of each
+    (ticker, period) run in a ProcessPoolExecutor; max_workers=1 runs them in this process.
+    Tickers and portfolios that cannot be loaded (portfolios: any of their tickers) are skipped and reported in
+    errors ((label, start, end) -> reason).
+    """
+
+    units = expand_job(job)
+    portfolio = portfolio_options(job)
+    max_workers = max_workers or job.get("max_workers") or os.cpu_count() or 1
+
+    def load(unit):
+        label, tickers, start, end, _ = unit
+        try:
+            return _load_unit(tickers, start, end, portfolio)
+        except Exception as e:
+            if errors is not None:
+                errors[label, start, end] = str(e)
+            logger.warning("Skipping %s (%s - %s): %s", label, start, end or "today", e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(load, units))
+
+    work = []
+    for (label, _, start, end, runs), df in zip(units, frames):
+        if df is None or df.empty:
+            if errors is not None:
+                errors.setdefault((label, start, end), "no data")
+            continue
+        work.append((label, start, end, df, runs))
+
+    if max_workers == 1:
+        rows = [row for unit in work for row in _run_unit(*unit)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_run_unit, *unit) for unit in work]
+            rows = [row for future in futures for row in future.result()]
+
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def run_universe_job(job: dict, output: str, max_workers: int | None = None, progress=None) -> int:
+    """Run a universe job (see load_job) with runner.stream_universe, writing the results to output
+    batch by batch; returns the number of rows written"""
+
+    periods = _periods(job) if job.get("periods") or job.get("start") else [(None, None)]
+    if len(periods) != 1:
+        raise ValueError("a universe job takes a single period")
+    strategies = job.get("strategies") or list(STRATEGIES)
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"unknown strategies: {', '.join(unknown)} (available: {', '.join(STRATEGIES)})")
+    params = job.get("params") or {}
+    unknown = [key for key in params if key not in PARAMETERS]
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(unknown)} (available: {', '.join(PARAMETERS)})")
+    grids = [key for key, value in params.items() if isinstance(value, list)]
+    if grids:
+        raise ValueError(f"a universe job takes single parameter values, not grids ({', '.join(grids)})")
+
+    start, end = periods[0]
+    return stream_universe(os.path.expanduser(job["universe"]), output, tickers=job.get("tickers"), start_date=start,
+                           end_date=end, strategies=strategies, batch_size=job.get("batch_size", 100),
+                           max_workers=max_workers or job.get("max_workers") or os.cpu_count() or 1,
+                           progress=progress, **params)
+
+
+def write_results(results: pd.DataFrame, path: str):
+    """Write the results as Parquet (.parquet, needs pyarrow or fastparquet) or CSV (anything else)"""
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith(".parquet"):
+        results.to_parquet(path, index=False)
+    else:
+        results.to_csv(path, index=False)
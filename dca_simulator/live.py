@@ -0,0 +1,326 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .backtest import TargetValueStrategy, run_backtest
+from .data_loader import load_price_data
+from .indicators import IndicatorCache
+from .metrics import KEY_METRICS_DTYPE, key_metrics_batch
+from .strategies import STRATEGIES, make_strategy
+
+
+#columns added by the accounting, the other columns of a strategy frame are Close and the signals
+ACCOUNTING = ["shares_total", "invested_total", "portf_value", "profit_loss"]
+STATE_VERSION = 1
+
+
+class LiveStrategy:
+    """A strategy kept up to date as daily bars are appended, instead of re-running it from the start.
+
+    The state is the strategy's monthly output (the columns run_strategy returns, about 12 rows a
+    year, kept as arrays), the amount invested or targeted each month, and the last `lookback`
+    daily closes its rolling windows need (252 for the Double Down 1-year high, sma_period for the
+    SMA rules). update() computes the signals over those closes and the new bars only, samples the
+    first trading day of each new month and carries shares_total / invested_total forward, so the
+    daily history is never reloaded, rolled or resampled again; a bar within a month already
+    sampled only joins the closes. The amounts of the new months are computed alone and the totals
+    carried forward from the month before, so an update costs the new bars and months, whatever the
+    length of the history. The frame and metrics equal those of a full run on the whole history
+    (rolling means up to rounding). Rules whose past amounts depend on the horizon (Lump Sum invests
+    months x monthly_contrib at the start) are re-accounted over the monthly columns.
+
+    to_dict() / from_dict() and save() / load() round-trip the state through JSON.
+    """
+
+    def __init__(self, name: str, params: dict, months: np.ndarray, columns: dict, amounts,
+                 recent_dates: np.ndarray, recent_close: np.ndarray, irr_guess: float | None = None, ticker: str | None = None):
+        self.name = name
+        self.strategy = make_strategy(name, **params)
+        self.params = {key: value for key, value in params.items() if hasattr(self.strategy, key)}
+        self.months = np.asarray(months, dtype="datetime64") #first day of each month, the frame's index (its unit kept)
+        self.columns = columns #{column: array}: Close, the signals, then ACCOUNTING
+        self.amounts = np.asarray(amounts, dtype=float) #contributions, or targets of a TargetValueStrategy
+        self.recent_dates = np.asarray(recent_dates, dtype="datetime64") #last daily bars, at least the last one
+        self.recent_close = np.asarray(recent_close, dtype=float)
+        self.irr_guess = irr_guess #monthly IRR of the last metrics(), warm-starts the next solve
+        self.ticker = ticker
+        self._frame = None #of the current columns
+        self._metrics = None
+
+    @classmethod
+    def start(cls, name: str, df: pd.DataFrame, ticker: str | None = None, **params) -> "LiveStrategy":
+        """Run the strategy once on the history df (daily Close, as load_price_data returns) and keep its state"""
+
+        if df is None or df.empty:
+            raise ValueError("a live strategy needs some price history to start from")
+        strategy = make_strategy(name, **params)
+        frame = run_backtest(strategy, df, IndicatorCache())
+        lookback = max(strategy.lookback, 1)
+        return cls(name, params, frame.index.values, {column: np.array(frame[column]) for column in frame.columns},
+                   _amounts(strategy, frame), df.index.values[-lookback:], df["Close"].to_numpy(dtype=float)[-lookback:],
+                   ticker=ticker)
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self.recent_dates[-1])
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The monthly output frame, as run_strategy returns it"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.columns, index=pd.DatetimeIndex(self.months, name="Date"))
+        return self._frame
+
+    def update(self, bars: pd.DataFrame) -> int:
+        """Append daily bars (a Close column, DatetimeIndex); bars up to last_date are ignored, so
+        overlapping downloads are harmless. Returns the number of months added to the frame."""
+
+        dates = np.asarray(bars.index.values, dtype="datetime64")
+        close = bars["Close"].to_numpy(dtype=float)
+        keep = (dates > self.recent_dates[-1]) & ~np.isnan(close)
+        order = np.argsort(dates[keep], kind="stable")
+        dates, close = dates[keep][order], close[keep][order]
+        if not len(dates):
+            return 0
+
+        lookback = max(self.strategy.lookback, 1)
+        window_dates = np.r_[self.recent_dates, dates]
+        window_close = np.r_[self.recent_close, close]
+        month = dates.astype("datetime64[M]")
+        current = self.months[-1].astype("datetime64[M]")
+        sampled = [column for column in self.columns if column not in ACCOUNTING]
+
+        if month[-1] == current and not any(pd.isna(self.columns[column][-1]) for column in sampled):
+            #most days: more bars of a month whose first day is already sampled, the frame does not change
+            self.recent_dates, self.recent_close = window_dates[-lookback:], window_close[-lookback:]
+            return 0
+
+        #signals of the new bars, from the closes their windows reach back to
+        window = pd.DataFrame({"Close": window_close}, index=pd.DatetimeIndex(window_dates, name="Date"))
+        new = {"Close": close}
+        for column, series in self.strategy.signals(window, IndicatorCache()).items():
+            new[column] = np.asarray(series)[len(self.recent_close):]
+
+        #first valid value of each month, like monthly_frame's resample("MS").first()
+        changed = False
+        in_current = month == current
+        for column in sampled:
+            if in_current.any() and pd.isna(self.columns[column][-1]):
+                values = new[column][in_current]
+                values = values[~pd.isna(values)]
+                if len(values):
+                    self.columns[column][-1] = values[0]
+                    changed = True
+
+        n_new = int((month[-1] - current).astype(int))
+        if n_new > 0: #a month without bars is an empty row, like in resample
+            group = (month - current).astype(int) - 1
+            for column in sampled:
+                self.columns[column] = np.concatenate([self.columns[column], _first_valid(new[column], group, n_new)])
+            new_months = np.arange(current + 1, month[-1] + 1, dtype="datetime64[M]").astype(self.months.dtype)
+            self.months = np.r_[self.months, new_months]
+
+        self.recent_dates, self.recent_close = window_dates[-lookback:], window_close[-lookback:]
+        if n_new > 0 or changed:
+            self._account(len(self.months) - n_new - changed) #the current month too if its signals changed
+            self._frame = None
+            self._metrics = None
+        return n_new
+
+    def _account(self, first: int):
+        """Fill the accounting columns from month `first` on (the months just appended, and the current
+        month when its signals were filled in): amounts of these months only, totals carried forward"""
+
+        columns = self.columns
+        if self.strategy.horizon_dependent:
+            first = 0
+        monthly = pd.DataFrame({column: values[first:] for column, values in columns.items() if column not in ACCOUNTING},
+                               index=pd.DatetimeIndex(self.months[first:], name="Date"))
+        amounts = _amounts(self.strategy, monthly, first)
+        if len(self.months) == len(self.amounts) and np.array_equal(amounts, self.amounts[first:], equal_nan=True):
+            return #only signals of the current month were filled in, its amount is the same
+
+        close = columns["Close"][first:].astype(float)
+        previous = (columns["shares_total"][first - 1], columns["invested_total"][first - 1]) if first else (0.0, 0.0)
+        if isinstance(self.strategy, TargetValueStrategy):
+            shares, invested = _continue_targets(close, amounts, *previous)
+        else:
+            shares, invested = _continue(close, amounts, *previous)
+
+        self.amounts = np.r_[self.amounts[:first], amounts]
+        shares = np.r_[columns["shares_total"][:first], shares]
+        invested = np.r_[columns["invested_total"][:first], invested]
+        portf_value = np.r_[columns["portf_value"][:first], shares[first:]*close]
+        #the accounting columns stay last, like in run_backtest
+        for column, values in (("shares_total", shares), ("invested_total", invested), ("portf_value", portf_value),
+                               ("profit_loss", portf_value - invested)):
+            columns.pop(column)
+            columns[column] = values
+
+    def metrics(self) -> np.record:
+        """key_metrics of the frame, the IRR solver starting from the previous result"""
+
+        if self._metrics is None:
+            years = (pd.Timestamp(self.months[-1]) - pd.Timestamp(self.months[0])).days/365
+            self._metrics = key_metrics_batch(self.columns["portf_value"][None, :], self.columns["invested_total"][None, :],
+                                              years, irr_guess=self.irr_guess)[0]
+            if self._metrics["IRR"] == self._metrics["IRR"]:
+                self.irr_guess = float((1 + self._metrics["IRR"]/100)**(1/12) - 1)
+        return self._metrics
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state: native bools and floats, missing values (empty months) as null"""
+
+        return {
+            "version": STATE_VERSION,
+            "ticker": self.ticker,
+            "strategy": self.name,
+            "params": self.params,
+            "shares_total": _to_json(self.columns["shares_total"][-1:])[0], #NaN after a month bought without a price
+            "invested_total": _to_json(self.columns["invested_total"][-1:])[0],
+            "irr_guess": self.irr_guess,
+            "amounts": _to_json(self.amounts),
+            "recent": {"dates": _dates(self.recent_dates), "unit": _unit(self.recent_dates), "close": _to_json(self.recent_close)},
+            "frame": {"dates": _dates(self.months), "unit": _unit(self.months),
+                      "columns": {column: _to_json(values) for column, values in self.columns.items()}},
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "LiveStrategy":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"unsupported live strategy state version: {state.get('version')}")
+        frame, recent = state["frame"], state["recent"]
+        return cls(state["strategy"], state["params"], np.array(frame["dates"], dtype=f"datetime64[{frame['unit']}]"),
+                   {column: _from_json(values) for column, values in frame["columns"].items()}, _from_json(state["amounts"]),
+                   np.array(recent["dates"], dtype=f"datetime64[{recent['unit']}]"), _from_json(recent["close"]),
+                   irr_guess=state.get("irr_guess"), ticker=state.get("ticker"))
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path) #atomic, an interrupted nightly run keeps the previous state
+
+    @classmethod
+    def load(cls, path: str) -> "LiveStrategy":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _amounts(strategy, monthly: pd.DataFrame, first_month: int = 0) -> np.ndarray:
+    if isinstance(strategy, TargetValueStrategy):
+        return np.asarray(strategy.targets(monthly, first_month), dtype=float)
+    return np.asarray(strategy.contributions(monthly), dtype=float)
+
+
+def _continue(close, contributions, shares_total, invested_total):
+    """simulate() over new months, starting from the previous totals (same sequential sums as np.cumsum)"""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares_bought = np.where(contributions != 0, contributions/close, 0.0)
+    return np.cumsum(np.r_[shares_total, shares_bought])[1:], np.cumsum(np.r_[invested_total, contributions])[1:]
+
+
+def _continue_targets(close, targets, shares_total, invested_total):
+    """The target value loop of kernels.py over new months, starting from the previous totals"""
+
+    shares, invested = np.empty(len(close)), np.empty(len(close))
+    for i, (price, target) in enumerate(zip(close.tolist(), targets.tolist())):
+        investment = target - shares_total*price
+        if investment > 0:
+            shares_total += investment/price
+            invested_total += investment
+        shares[i] = shares_total
+        invested[i] = invested_total
+    return shares, invested
+
+
+def _first_valid(values: np.ndarray, group: np.ndarray, n_groups: int) -> np.ndarray:
+    """First non-missing value of each group 0..n_groups-1 of values (group < 0: ignored), missing if none"""
+
+    firsts = []
+    for g in range(n_groups):
+        found = values[(group == g) & ~pd.isna(values)]
+        firsts.append(found[0] if len(found) else np.nan)
+    if all(len(values[group == g]) for g in range(n_groups)) and not pd.isna(firsts).any():
+        return np.array(firsts, dtype=values.dtype)
+    #like resample: a bool signal with a missing month becomes 1.0/0.0/NaN
+    return np.array(firsts, dtype=float if values.dtype.kind in "fb" else object)
+
+
+def _to_json(values: np.ndarray) -> list:
+    """Column values as JSON natives (bool, float, numpy scalars of object columns unwrapped),
+    missing values (months without bars) as None"""
+
+    if values.dtype.kind not in "fb":
+        return [None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value for value in values.tolist()]
+    out = values.tolist()
+    if values.dtype.kind == "f":
+        for i in np.flatnonzero(np.isnan(values)).tolist():
+            out[i] = None
+    return out
+
+
+def _from_json(values: list) -> np.ndarray:
+    """Inverse of _to_json: a column with missing values is float, NaN where missing"""
+    if any(value is None for value in values):
+        return np.array([np.nan if value is None else value for value in values], dtype=float)
+    return np.array(values)
+
+
+def _dates(dates: np.ndarray) -> list[str]:
+    return np.datetime_as_string(dates).tolist() #ISO, at the arrays' own resolution
+
+
+def _unit(dates: np.ndarray) -> str:
+    return np.datetime_data(dates.dtype)[0]
+
+
+def _state_path(directory: str, ticker: str, name: str) -> str:
+    return os.path.join(directory, f"{ticker}_{name.replace(' ', '_')}.json")
+
+
+def start_tracking(directory: str, ticker: str, start_date: str, end_date: str | None = None,
+                   strategies=tuple(STRATEGIES), **params) -> list[str]:
+    """Backtest ticker from start_date once and save one state file per strategy in directory
+    (refresh() then keeps them up to date); returns the paths"""
+
+    df = load_price_data(ticker, start_date, end_date)
+    if df.empty:
+        raise ValueError(f"no data for {ticker}")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name in strategies:
+        path = _state_path(directory, ticker, name)
+        LiveStrategy.start(name, df, ticker=ticker, **params).save(path)
+        paths.append(path)
+    return paths
+
+
+def refresh(directory: str, end_date: str | None = None) -> pd.DataFrame:
+    """Nightly update of every state saved in directory: the bars after the states' last date are
+    loaded once per ticker (through load_price_data), appended, and the states saved back.
+    Returns one row per state: ticker, strategy, last date and the key_metrics fields."""
+
+    states = {path: LiveStrategy.load(path) for path in sorted(glob.glob(os.path.join(directory, "*.json")))}
+    by_ticker = {}
+    for path, live in states.items():
+        by_ticker.setdefault(live.ticker, []).append(path)
+
+    rows = []
+    for ticker, paths in by_ticker.items():
+        start = min(states[path].last_date for path in paths) + pd.Timedelta(days=1)
+        bars = load_price_data(ticker, start.strftime("%Y-%m-%d"), end_date) if ticker else pd.DataFrame()
+        for path in paths:
+            live = states[path]
+            if not bars.empty:
+                live.update(bars)
+            metrics = live.metrics()
+            live.save(path)
+            row = {"ticker": ticker, "strategy": live.name, "last_date": live.last_date}
+            row.update({field: float(metrics[field]) for field in KEY_METRICS_DTYPE.names})
+            rows.append(row)
+    return pd.DataFrame(rows, columns=["ticker", "strategy", "last_date", *KEY_METRICS_DTYPE.names])
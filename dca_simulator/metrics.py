@@ -1,6 +1,175 @@
 import pandas as pd
 import numpy as np
-import numpy_financial as npf
+from .timing import span
+
+def irr_batch(cashflows, guess=None, lower: float = -0.9999, upper: float = 10.0,
+              tol: float = 1e-10, maxiter: int = 100) -> np.ndarray:
+    """Periodic IRR of every row of a 2-D cashflow array (one cashflow vector per row).
+    Safeguarded Newton (rtsafe): a step that leaves the [lower, upper] bracket or converges too slowly
+    is replaced by bisection. Without a guess, each row starts from its money multiple spread over the
+    average holding period. Rows without a sign change of the NPV inside the bracket return NaN; the
+    default bracket reaches down to -99.99% per period, so crashes still get a rate."""
+
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    n_rows, n_periods = cf.shape
+    t = np.arange(n_periods)
+
+    def npv(rate, rows):
+        log_disc = np.multiply.outer(-np.log1p(rate), t) #(1+rate)**-t, exp is cheaper than power
+        #a negative rate compounds the last cashflow the most: dividing by its factor keeps deep losses
+        #from overflowing and leaves the sign and the Newton step unchanged (a no-op for rate >= 0)
+        shift = np.maximum(log_disc[:, -1], 0)
+        disc = np.exp(log_disc - shift[:, None])
+        discounted = cf[rows]*disc
+        value = discounted.sum(axis=1)
+        slope = -(discounted @ t)/(1 + rate)
+        return value, slope
+
+    if guess is None:
+        outflows = np.clip(-cf, 0, None)
+        paid = outflows.sum(axis=1)
+        received = np.clip(cf, 0, None).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            holding = (n_periods - 1) - (outflows*t).sum(axis=1)/paid
+            guess = (received/paid)**(1/np.maximum(holding, 1)) - 1
+        guess = np.where(np.isfinite(guess), guess, 0.01)
+
+    all_rows = np.arange(n_rows)
+    lo = np.full(n_rows, lower)
+    hi = np.full(n_rows, upper)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        f_lo, _ = npv(lo, all_rows)
+        f_hi, _ = npv(hi, all_rows)
+        bracketed = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo) != np.sign(f_hi))
+
+        rate = np.clip(np.broadcast_to(np.asarray(guess, dtype=float), n_rows), lower, upper).copy()
+        dx_old = np.full(n_rows, upper - lower)
+        active = bracketed.copy()
+        for _ in range(maxiter):
+            idx = np.flatnonzero(active)
+            if idx.size == 0:
+                break
+            x = rate[idx]
+            value, slope = npv(x, idx)
+
+            #shrink the bracket around the root
+            keep_lo = np.sign(value) == np.sign(f_lo[idx])
+            lo[idx[keep_lo]] = x[keep_lo]
+            f_lo[idx[keep_lo]] = value[keep_lo]
+            hi[idx[~keep_lo]] = x[~keep_lo]
+
+            step = value/slope
+            new = x - step
+            slow = np.abs(2*value) > np.abs(dx_old[idx]*slope)
+            bisect = ~np.isfinite(new) | (new <= lo[idx]) | (new >= hi[idx]) | slow
+            new[bisect] = (lo[idx][bisect] + hi[idx][bisect])/2
+            new[value == 0] = x[value == 0] #landed exactly on the root
+
+            dx_old[idx] = np.abs(new - x)
+            rate[idx] = new
+            done = (dx_old[idx] < tol) | (value == 0)
+            active[idx[done]] = False
+
+    rate[~bracketed] = np.nan
+    rate[active] = np.nan #did not converge
+    return rate
+
+
+
+KEY_METRICS_DTYPE = np.dtype([
+    ("invested_total", "f8"),
+    ("final_value", "f8"),
+    ("ROI", "f8"),          # %
+    ("IRR", "f8"),          # % per year
+    ("CAGR", "f8"),         # %
+    ("max_drawdown", "f8"), # %
+    ("calmar", "f8"),
+    ("years", "f8"),
+])
+
+
+def key_metrics_batch(portf_value, invested_total, years, irr_guess=None) -> np.ndarray:
+    """Numeric key metrics for a batch of strategy paths.
+    portf_value, invested_total: arrays of shape (n_paths, n_months); years: scalar or (n_paths,).
+    Returns a record array with KEY_METRICS_DTYPE, one record per path.
+    irr_guess (monthly rate, scalar or per path) warm-starts the IRR solver, e.g. with the result of a previous run."""
+
+    portf_value = np.atleast_2d(np.asarray(portf_value, dtype=float))
+    invested_total = np.atleast_2d(np.asarray(invested_total, dtype=float))
+    years = np.broadcast_to(np.asarray(years, dtype=float), portf_value.shape[:1])
+
+    final_value = portf_value[:, -1]
+    final_invested = invested_total[:, -1]
+
+    # ROI / CAGR guards
+    valid = (final_invested > 0) & (years > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(valid, final_value/final_invested, np.nan)
+        ROI = (ratio - 1)*100
+        CAGR = (ratio**(1/np.where(valid, years, 1)) - 1)*100
+
+        # Drawdown (NaN values, e.g. before the first purchase, are skipped like pandas does)
+        peak = np.fmax.accumulate(portf_value, axis=1)
+        drawdown = portf_value/peak - 1
+        drawdown[~np.isfinite(drawdown)] = np.nan
+        all_nan = np.isnan(drawdown).all(axis=1)
+        drawdown[all_nan] = 0
+        max_drawdown = np.nanmin(drawdown, axis=1)*100
+        max_drawdown[all_nan] = np.nan
+
+        # Calmar
+        calmar = np.where((max_drawdown == 0) | np.isnan(CAGR), np.nan, CAGR/np.abs(max_drawdown))
+
+    # IRR (monthly cashflows)
+    cashflows = -np.diff(invested_total, axis=1, prepend=0)
+    cashflows[:, -1] += final_value
+    with span("irr"):
+        irr_monthly = irr_batch(cashflows, guess=irr_guess)
+    irr_annual = ((1 + irr_monthly)**12 - 1)*100
+
+    out = np.empty(len(portf_value), dtype=KEY_METRICS_DTYPE)
+    out["invested_total"] = final_invested
+    out["final_value"] = final_value
+    out["ROI"] = ROI
+    out["IRR"] = irr_annual
+    out["CAGR"] = CAGR
+    out["max_drawdown"] = max_drawdown
+    out["calmar"] = calmar
+    out["years"] = years
+    return out.view(np.recarray)
+
+
+def key_metrics(df: pd.DataFrame, irr_guess=None) -> np.record:
+    """Numeric key metrics of one strategy output dataframe (columns portf_value, invested_total, datetime index).
+    Same values as compute_KeyMetrics, as floats instead of display strings; all NaN for an empty frame."""
+
+    if df is None or df.empty:
+        out = np.full(1, np.nan, dtype=[(name, "f8") for name in KEY_METRICS_DTYPE.names])
+        return out.astype(KEY_METRICS_DTYPE).view(np.recarray)[0]
+
+    years = (df.index[-1] - df.index[0]).days / 365
+    return key_metrics_batch(df["portf_value"].to_numpy(dtype=float)[None, :],
+                             df["invested_total"].to_numpy(dtype=float)[None, :],
+                             years, irr_guess=irr_guess)[0]
+
+
+def format_KeyMetrics(metrics) -> dict:
+    """Presentation layer: turn a key_metrics record into the strings shown in the metrics table"""
+
+    ROI, irr_annual, CAGR = metrics["ROI"], metrics["IRR"], metrics["CAGR"]
+    calmar, years = metrics["calmar"], metrics["years"]
+
+    return {
+        "Total Invested": f"${metrics['invested_total']:,.2f}",
+        "Final Value": f"${metrics['final_value']:,.2f}",
+        "ROI": f"{ROI:,.2f}%" if ROI == ROI else "—",
+        "IRR": f"{irr_annual:,.2f}%" if irr_annual == irr_annual else "—",
+        "CAGR": f"{CAGR:,.2f}%" if CAGR == CAGR else "—",
+        "Max Drawdown": f"{metrics['max_drawdown']:,.2f}%",
+        "Calmar Ratio": round(float(calmar), 2) if calmar == calmar else "—",
+        "Years": round(float(years), 1) if years == years else "—",
+    }
+
 
 def compute_KeyMetrics(df: pd.DataFrame) -> dict:
     """Compute summary performance metrics from a strategy output dataframe.
@@ -19,57 +188,8 @@ def compute_KeyMetrics(df: pd.DataFrame) -> dict:
             "Years": "—",
         }
 
-    final_value = float(df["portf_value"].iloc[-1])
-    final_invested = float(df["invested_total"].iloc[-1])
-
-    start_date = df.index[0]
-    end_date = df.index[-1]
-    years = (end_date - start_date).days / 365
-
-    # ROI / CAGR guards
-    if final_invested <= 0 or years <= 0:
-        ROI = np.nan
-        CAGR = np.nan
-    else:
-        ROI = (final_value / final_invested - 1) * 100
-        CAGR = ((final_value / final_invested) ** (1 / years) - 1) * 100
-
-    # Drawdown
-    peak = df["portf_value"].cummax()
-    drawdown = df["portf_value"] / peak - 1
-    max_drawdown = float(drawdown.min() * 100)
-
-    # Calmar
-    if max_drawdown == 0 or pd.isna(CAGR):
-        calmar = np.nan
-    else:
-        calmar = float(CAGR / abs(max_drawdown))
-
-    # IRR (monthly cashflows)
-    irr_annual = np.nan
-    try:
-        cashflows = []
-        cashflows.append(-float(df["invested_total"].iloc[0]))
-        cashflows.extend((-df["invested_total"].diff().iloc[1:]).astype(float).tolist())
-        cashflows[-1] += final_value
-        cashflows = np.array(cashflows, dtype=float)
-
-        irr_monthly = npf.irr(cashflows)
-        if irr_monthly == irr_monthly:  # not nan
-            irr_annual = ((1 + irr_monthly) ** 12 - 1) * 100
-    except Exception:
-        pass
-
-    return {
-        "Total Invested": f"${final_invested:,.2f}",
-        "Final Value": f"${final_value:,.2f}",
-        "ROI": f"{ROI:,.2f}%" if ROI == ROI else "—",
-        "IRR": f"{irr_annual:,.2f}%" if irr_annual == irr_annual else "—",
-        "CAGR": f"{CAGR:,.2f}%" if CAGR == CAGR else "—",
-        "Max Drawdown": f"{max_drawdown:,.2f}%",
-        "Calmar Ratio": round(calmar, 2) if calmar == calmar else "—",
-        "Years": round(years, 1) if years == years else "—",
-    }
+    with span("metrics"):
+        return format_KeyMetrics(key_metrics(df))
 
 
 
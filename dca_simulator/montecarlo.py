@@ -0,0 +1,133 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtest import simulate_batch
+from .metrics import KEY_METRICS_DTYPE, key_metrics_batch
+from .robustness import summarize_windows
+from .strategies import STRATEGIES, make_strategy
+
+
+def monthly_log_returns(df: pd.DataFrame) -> np.ndarray:
+    """Log returns between the first trading days of consecutive months (the strategies' monthly grid)"""
+
+    close = df["Close"].resample("MS").first().dropna().to_numpy(dtype=float)
+    return np.diff(np.log(close))
+
+
+def block_bootstrap_paths(returns: np.ndarray, n_paths: int, n_months: int, block: int = 12,
+                          start_price: float = 100.0, seed=None) -> np.ndarray:
+    """Synthetic monthly price paths, shape (n_paths, n_months), from a circular block bootstrap of
+    historical monthly log returns: blocks of `block` consecutive months (12 keeps a year of
+    autocorrelation and volatility clustering) are drawn at random start months and chained."""
+
+    returns = np.asarray(returns, dtype=float)
+    if returns.size == 0:
+        raise ValueError("block_bootstrap_paths needs at least one historical return")
+    rng = np.random.default_rng(seed)
+
+    n_returns = n_months - 1
+    n_blocks = -(-n_returns//block) #ceil
+    starts = rng.integers(0, len(returns), size=(n_paths, n_blocks))
+    #circular: a block running past the last month wraps around to the first ones
+    idx = (starts[:, :, None] + np.arange(block)) % len(returns)
+    sampled = returns[idx.reshape(n_paths, -1)[:, :n_returns]]
+
+    paths = np.empty((n_paths, n_months))
+    paths[:, 0] = 0.0
+    np.cumsum(sampled, axis=1, out=paths[:, 1:])
+    return start_price*np.exp(paths)
+
+
+def fit_gbm(df: pd.DataFrame) -> tuple[float, float]:
+    """Annual drift and volatility of a geometric Brownian motion fitted to the monthly returns of df"""
+
+    returns = monthly_log_returns(df)
+    sigma = returns.std(ddof=1)*np.sqrt(12)
+    mu = returns.mean()*12 + sigma**2/2
+    return float(mu), float(sigma)
+
+
+def gbm_paths(mu: float, sigma: float, n_paths: int, n_months: int, start_price: float = 100.0, seed=None) -> np.ndarray:
+    """Synthetic monthly price paths, shape (n_paths, n_months), of a geometric Brownian motion
+    with annual drift mu and volatility sigma (see fit_gbm)"""
+
+    rng = np.random.default_rng(seed)
+    dt = 1/12
+    shocks = rng.standard_normal((n_paths, n_months - 1))
+
+    paths = np.empty((n_paths, n_months))
+    paths[:, 0] = 0.0
+    np.cumsum((mu - sigma**2/2)*dt + sigma*np.sqrt(dt)*shocks, axis=1, out=paths[:, 1:])
+    return start_price*np.exp(paths)
+
+
+def path_contributions(name: str, paths: np.ndarray, monthly_contrib: float = 150, **params) -> np.ndarray:
+    """Monthly contributions of a strategy on every path at once, shape (n_paths, n_months).
+
+    The rules are those of the Strategy classes (Strategy.contributions_batch) on a monthly grid:
+    the 252-day high becomes the 12-month high and the sma_period-day SMA the mean of the last
+    sma_period/21 month starts (at least 2). Like the daily versions, no double down / SMA signal
+    fires before the window is filled.
+    """
+
+    return make_strategy(name, monthly_contrib=monthly_contrib, **params).contributions_batch(np.asarray(paths, dtype=float))
+
+
+def _simulate_chunk(paths: np.ndarray, strategies, params: dict) -> dict:
+    """{strategy: key_metrics_batch records} for one block of paths"""
+
+    years = (paths.shape[1] - 1)/12
+    results = {}
+    for name in strategies:
+        shares, invested = simulate_batch(make_strategy(name, **params), paths)
+        results[name] = key_metrics_batch(shares*paths, invested, years)
+    return results
+
+
+def simulate_paths(paths: np.ndarray, strategies=tuple(STRATEGIES), max_workers: int | None = 1,
+                   chunk_size: int = 2000, **params) -> pd.DataFrame:
+    """Run every strategy on every synthetic path (one row of paths = one month-start price history).
+
+    params: monthly_contrib, DD_threshold, sma_period, goal_monthly_growth (strategy defaults otherwise;
+    monthly_contrib defaults to 150 like the app). Each strategy is evaluated on all paths of a chunk at once:
+    contributions, share accounting, drawdown and the IRR solver are (paths x months) array
+    operations (Strategy.contributions_batch), only Value Averaging walks the months
+    (kernels.simulate_targets_batch, compiled with Numba when it is installed).
+
+    max_workers > 1 (or None for every CPU) splits the paths in chunks over a process pool.
+    Returns a tidy frame: one row per (strategy, path) with the key_metrics fields; see summarize_paths.
+    """
+
+    paths = np.asarray(paths, dtype=float)
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {unknown}")
+    params.setdefault("monthly_contrib", 150)
+
+    chunks = [paths[start:start + chunk_size] for start in range(0, len(paths), chunk_size)]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(chunks) == 1:
+        parts = [_simulate_chunk(chunk, strategies, params) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parts = list(pool.map(_simulate_chunk, chunks, [strategies]*len(chunks), [params]*len(chunks)))
+
+    frames = []
+    for name in strategies:
+        frame = pd.DataFrame(np.concatenate([part[name] for part in parts]))
+        frame.insert(0, "strategy", name)
+        frame.insert(1, "path", np.arange(len(paths)))
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["strategy", "path", *KEY_METRICS_DTYPE.names])
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize_paths(results: pd.DataFrame, fields=("final_value", "IRR", "max_drawdown"),
+                    percentiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+    """Distribution of the simulated outcomes per strategy (mean, min, percentiles, max)"""
+
+    return summarize_windows(results, fields, percentiles)
@@ -1,7 +1,8 @@
-import matplotlib.pyplot as plt
+#matplotlib and holoviews are imported on first use, the app imports this module at startup
 
 def plot_profit_loss(*dfs, labels=None):
     """Used to plot plofit_loss of different strategies in one graph for comparison"""
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12,6))
 
@@ -21,6 +22,7 @@ def plot_profit_loss(*dfs, labels=None):
 
 def plot_portf_value(*dfs, labels=None):
     """Used to plot portf_value of different strategies in one graph for comparison"""
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12,6))
 
@@ -40,6 +42,7 @@ def plot_portf_value(*dfs, labels=None):
 
 def plot_shares_total(*dfs, labels=None):
     """Used to plot shares_total of different strategies in one graph for comparison"""
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12,6))
 
@@ -60,6 +63,7 @@ def plot_shares_total(*dfs, labels=None):
 
 def plot_monthly_investment(*dfs, labels=None):
     """Used to plot monthly_investment of different strategies in one graph for comparison"""
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12,3))
 
@@ -81,6 +85,7 @@ def plot_monthly_investment(*dfs, labels=None):
 
 def plot_invested_total(*dfs, labels=None):
     """Used to plot cumulative invested_total of different strategies in one graph for comparison"""
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12,3))
 
@@ -96,3 +101,29 @@ def plot_invested_total(*dfs, labels=None):
     plt.grid(False)
     plt.legend()
     plt.show()
+
+
+
+#points kept per line by downsample_plot; a 50-year daily series has ~13,000, a plot is ~1,000 pixels wide
+DEFAULT_PLOT_POINTS = 1000
+
+
+def downsample_plot(obj, n_points: int = DEFAULT_PLOT_POINTS, algorithm: str = "lttb"):
+    """Downsample every curve of a (overlaid) hvplot line plot on the server before it is sent to the browser.
+
+    Each curve keeps at most n_points points, picked by the Largest Triangle Three Buckets
+    algorithm (peaks and crashes are kept, flat stretches are thinned). The result is a
+    DynamicMap linked to the x range: zooming in downsamples only the visible window again,
+    so once the window holds fewer than n_points points the exact series is drawn.
+
+    "minmax", "m4" and "minmax-lttb" are also accepted when tsdownsample is installed (it
+    speeds up "lttb" as well). n_points=0 or None returns obj unchanged (every point).
+    """
+
+    if not n_points:
+        return obj
+    from holoviews.operation.downsample import downsample1d
+    from holoviews.streams import RangeX
+
+    #a fixed point budget instead of the plot's pixel width (downsample1d's default PlotSize stream)
+    return downsample1d(obj, width=int(n_points), algorithm=algorithm, streams=[RangeX])
@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+
+
+#weight schemes: equal, market_cap (starting capitalizations grown with the price), price (the former average of
+#prices), custom ({ticker: weight})
+WEIGHTINGS = ("equal", "market_cap", "price", "custom")
+#months between two rebalancings, 0: buy and hold
+REBALANCE_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12, "never": 0}
+
+
+def price_matrix(prices: pd.DataFrame) -> tuple[pd.DatetimeIndex, list[str], np.ndarray]:
+    """(dates, tickers, closes of shape dates x tickers) of an aligned price frame, such as the output of
+    load_multiple_price_data (Date column, one column per ticker, Portfolio column ignored)"""
+
+    if "Date" in prices.columns:
+        prices = prices.set_index("Date")
+    prices = prices.drop(columns=["Portfolio"], errors="ignore")
+    return pd.DatetimeIndex(prices.index), list(prices.columns), prices.to_numpy(dtype=float)
+
+
+def parse_weights(text: str) -> dict:
+    """'AAPL: 0.5, MSFT: 0.3, NVDA: 0.2' -> {'AAPL': 0.5, 'MSFT': 0.3, 'NVDA': 0.2}"""
+
+    weights = {}
+    for item in filter(None, (part.strip() for part in text.replace(";", ",").split(","))):
+        ticker, sep, value = item.partition(":")
+        if not sep:
+            raise ValueError(f"Custom weight '{item}' is not of the form TICKER: weight")
+        try:
+            weights[ticker.strip().upper()] = float(value)
+        except ValueError:
+            raise ValueError(f"Custom weight of {ticker.strip()} is not a number: {value.strip()}") from None
+    return weights
+
+
+def target_weights(close: np.ndarray, tickers: list[str], weighting: str = "equal", weights: dict | None = None,
+                   market_caps: dict | None = None, first_close: np.ndarray | None = None) -> np.ndarray:
+    """Target weights for each row of close (rows x tickers, NaN: not listed yet), rows sum to 1 over the
+    tickers that have a price (0 where none has).
+
+    equal: 1/n. custom: weights ({ticker: weight}, missing tickers 0), renormalized.
+    market_cap: market_caps ({ticker: capitalization at its first price}, every ticker needed) grown with the
+    price since first_close (the first valid price of each ticker). Without market_caps every ticker starts
+    with the same weight, which then drifts with its price: equal starting weights, not capitalizations.
+    price: proportional to the price, what an average of prices holds (one share of each ticker).
+    """
+
+    available = np.isfinite(close)
+    if weighting == "equal":
+        raw = available.astype(float)
+    elif weighting == "custom":
+        if not weights:
+            raise ValueError("Custom weighting needs weights ({ticker: weight})")
+        unknown = [ticker for ticker in weights if ticker not in tickers]
+        if unknown:
+            raise ValueError(f"Custom weights for tickers not in the portfolio: {', '.join(unknown)}")
+        vector = np.array([float(weights.get(ticker, 0.0)) for ticker in tickers])
+        if (vector < 0).any() or vector.sum() <= 0:
+            raise ValueError("Custom weights must be non-negative and not all zero")
+        raw = np.where(available, vector, 0.0)
+    elif weighting == "market_cap":
+        missing = [ticker for ticker in tickers if ticker not in market_caps] if market_caps else []
+        if missing:
+            raise ValueError(f"Market caps missing for: {', '.join(missing)}")
+        caps = np.array([float((market_caps or {}).get(ticker, 1.0)) for ticker in tickers])
+        if first_close is None:
+            first_close = _first_valid(close)
+        with np.errstate(invalid="ignore"):
+            raw = np.where(available, caps*close/first_close, 0.0)
+    elif weighting == "price":
+        raw = np.where(available, close, 0.0)
+    else:
+        raise ValueError(f"Unknown weighting '{weighting}' (available: {', '.join(WEIGHTINGS)})")
+
+    total = raw.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, raw/total, 0.0)
+
+
+def _first_valid(close: np.ndarray) -> np.ndarray:
+    """First non-NaN value of every column (NaN for empty columns)"""
+    available = np.isfinite(close)
+    first = available.argmax(axis=0)
+    return np.where(available.any(axis=0), close[first, np.arange(close.shape[1])], np.nan)
+
+
+def rebalance_starts(dates: pd.DatetimeIndex, rebalance: str) -> np.ndarray:
+    """Positions of the rebalancing days: the first day, then the first trading day of every
+    1, 3 or 12 months (counted from the first month)"""
+
+    if rebalance not in REBALANCE_MONTHS:
+        raise ValueError(f"Unknown rebalancing '{rebalance}' (available: {', '.join(REBALANCE_MONTHS)})")
+    every = REBALANCE_MONTHS[rebalance]
+    if every == 0 or len(dates) == 0:
+        return np.zeros(min(len(dates), 1), dtype=int)
+
+    month = (dates.year - dates[0].year)*12 + (dates.month - dates[0].month)
+    new_month = np.r_[True, np.diff(month) > 0]
+    return np.flatnonzero(new_month & (month % every == 0))
+
+
+def portfolio_index(prices: pd.DataFrame, weighting: str = "equal", rebalance: str = "monthly", weights: dict | None = None,
+                    market_caps: dict | None = None, base: float = 100.0) -> pd.Series:
+    """Daily value of one portfolio unit (starting at base): the tickers are held at their target weights
+    on every rebalancing day and drift with their prices in between. Buying units of this index on the
+    first trading day of a month buys every ticker in proportion of its current weight, so the strategies
+    run on it invest in the actual multi-asset portfolio.
+
+    Tickers listed after the start join at the next rebalancing. Vectorized over the ticker axis,
+    no loop over tickers or days.
+    """
+
+    dates, tickers, close = price_matrix(prices)
+    if len(dates) == 0:
+        return pd.Series([], index=dates, name="Close", dtype=float)
+
+    starts = rebalance_starts(dates, rebalance)
+    segment = np.searchsorted(starts, np.arange(len(dates)), side="right") - 1
+    start_close = close[starts]
+    w = target_weights(start_close, tickers, weighting, weights, market_caps, first_close=_first_valid(close))
+
+    #shares of each ticker held per unit during a segment (0 for tickers without weight)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        units = np.where(w > 0, w/start_close, 0.0)
+    priced = np.nan_to_num(close) #tickers not listed yet have no shares
+    invested = w.sum(axis=1) > 0
+
+    #value on each day of one unit invested on the segment's rebalancing day: one matrix-vector
+    #product per segment (no dates x tickers temporaries)
+    bounds = np.r_[starts, len(dates)]
+    growth = np.empty(len(dates))
+    for s, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        growth[lo:hi] = priced[lo:hi] @ units[s] if invested[s] else 1.0 #no ticker priced yet: the unit stays in cash
+
+    #level at each rebalancing day: compounded growth of the previous segments
+    #(growth of each segment up to the next rebalancing day, before rebalancing)
+    segment_growth = np.where(invested[:-1], (priced[starts[1:]]*units[:-1]).sum(axis=1), 1.0)
+    level = base*np.cumprod(np.r_[1.0, segment_growth])
+    return pd.Series(level[segment]*growth, index=pd.DatetimeIndex(dates, name="Date"), name="Close")
+
+
+def simulate_holdings(close: np.ndarray, contributions: np.ndarray, weights: np.ndarray,
+                      rebalance: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-ticker accounting of a monthly contribution vector: (holdings months x tickers in shares,
+    invested_total, portf_value).
+
+    close, weights: months x tickers (NaN price: not listed, weight 0). Each contribution is split across
+    the tickers by that month's weights; on the months flagged in rebalance the whole portfolio
+    (contribution included) is brought back to the weights. Between two rebalancings the holdings are a
+    cumulative sum over months, the tickers are always one array axis.
+    """
+
+    close = np.asarray(close, dtype=float)
+    contributions = np.asarray(contributions, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bought = np.where(weights > 0, contributions[:, None]*weights/close, 0.0)
+
+    holdings = np.empty(close.shape)
+    bounds = np.r_[np.flatnonzero(rebalance), len(close)]
+    if bounds[0] != 0: #before the first rebalancing
+        holdings[:bounds[0]] = np.cumsum(bought[:bounds[0]], axis=0)
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        previous = holdings[start - 1] if start > 0 else np.zeros(close.shape[1])
+        value = np.where(previous > 0, previous*close[start], 0.0).sum() + contributions[start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rebalanced = np.where(weights[start] > 0, value*weights[start]/close[start], 0.0)
+        holdings[start] = rebalanced
+        holdings[start + 1:end] = rebalanced + np.cumsum(bought[start + 1:end], axis=0)
+
+    portf_value = np.where(holdings > 0, holdings*close, 0.0).sum(axis=1)
+    return holdings, np.cumsum(contributions), portf_value
+
+
+def run_portfolio(prices: pd.DataFrame, monthly_contrib: float = 150, weighting: str = "equal", rebalance: str = "never",
+                  weights: dict | None = None, market_caps: dict | None = None, contributions=None,
+                  base: float = 100.0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Multi-asset DCA: invest monthly_contrib (or the contributions vector, one amount per month, e.g. of
+    another strategy) on the first trading day of each month, split across the tickers by weight.
+
+    Returns (frame, holdings). frame has the columns of a strategy output (Close, shares_total,
+    invested_total, portf_value, profit_loss, so key_metrics applies): Close is the time weighted value
+    of a portfolio unit (starting at base) and shares_total the units held. holdings has the shares of
+    each ticker (months x tickers). The app and batch jobs only need the unit value (portfolio_index),
+    the holdings are a Python API.
+    """
+
+    dates, tickers, close = price_matrix(prices)
+    #rows of the first trading day of each month (not resample().first(), which would take the first
+    #price of a ticker listed during the month): tickers join on the first month they have a price
+    first_days = rebalance_starts(dates, "monthly")
+    monthly_close = close[first_days]
+    index = pd.DatetimeIndex(dates[first_days].to_period("M").to_timestamp(), name="Date")
+    n_months = len(index)
+
+    if contributions is None:
+        contributions = np.full(n_months, float(monthly_contrib))
+    contributions = np.asarray(contributions, dtype=float)
+    if len(contributions) != n_months:
+        raise ValueError(f"contributions has {len(contributions)} months, the prices {n_months}")
+
+    w = target_weights(monthly_close, tickers, weighting, weights, market_caps, first_close=_first_valid(close))
+    every = REBALANCE_MONTHS.get(rebalance)
+    if every is None:
+        raise ValueError(f"Unknown rebalancing '{rebalance}' (available: {', '.join(REBALANCE_MONTHS)})")
+    flags = (np.arange(n_months) % every == 0) if every else np.zeros(n_months, dtype=bool)
+
+    holdings, invested_total, portf_value = simulate_holdings(monthly_close, contributions, w, flags)
+
+    #unit value: growth of the holdings between two months, contributions excluded
+    previous = np.vstack([np.zeros((1, len(tickers))), holdings[:-1]])
+    value_before = np.where(previous > 0, previous*monthly_close, 0.0).sum(axis=1)
+    value_after = np.r_[0.0, portf_value[:-1]]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.where(value_after > 0, value_before/value_after, 1.0)
+    unit_value = base*np.cumprod(growth)
+
+    frame = pd.DataFrame({
+        "Close": unit_value,
+        "shares_total": np.cumsum(contributions/unit_value),
+        "invested_total": invested_total,
+        "portf_value": portf_value,
+    }, index=index)
+    frame["profit_loss"] = frame["portf_value"] - frame["invested_total"]
+    return frame, pd.DataFrame(holdings, index=index, columns=tickers)
@@ -0,0 +1,220 @@
+import datetime as dt
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def default_cache_dir() -> str:
+    """Cache location: $DCA_SIMULATOR_CACHE_DIR, or ~/.cache/dca_simulator/prices"""
+    return os.environ.get("DCA_SIMULATOR_CACHE_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "dca_simulator", "prices"))
+
+
+class PriceCache:
+    """On-disk cache of daily closes, one directory per ticker.
+
+    Each entry stores the dates (int64 ns) and closes (float64) as .npy files that are
+    memory-mapped on read, plus a meta.json with the covered date range [start, end).
+    A request outside the covered range only downloads the missing part before/after it.
+
+    downloader(ticker, start_date, end_date) -> DataFrame with a "Close" column and a
+    datetime index, end_date exclusive (same convention as yf.download). Swap it for a
+    local stand-in in tests or notebooks.
+
+    ttl: entries older than this (seconds) are downloaded again in full, because adjusted
+    closes of past bars change after splits and dividends.
+    empty_ttl: a gap whose download succeeded but returned no bars (a weekend, a holiday) is
+    not downloaded again for this many seconds. A downloader that fails should raise, so the
+    gap stays missing and is retried on the next call.
+    max_bytes: total size of the cache; least recently used tickers are evicted first.
+    offline: never call the downloader, only serve what is already cached.
+    """
+
+    def __init__(self, directory: str | None = None, downloader=None, ttl: float = 7*24*3600,
+                 empty_ttl: float = 6*3600, max_bytes: int = 512*1024**2, offline: bool = False):
+        self.directory = directory or default_cache_dir()
+        self.downloader = downloader
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._ticker_locks = {}
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        key = os.path.basename(self._path(ticker))
+        with self._lock:
+            return self._ticker_locks.setdefault(key, threading.Lock())
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9.^=-]", "_", ticker.upper()))
+
+    def _read_meta(self, ticker: str) -> dict | None:
+        try:
+            with open(os.path.join(self._path(ticker), "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, ticker: str, meta: dict):
+        path = os.path.join(self._path(ticker), "meta.json")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path) #atomic, readers never see a half written file
+
+    def _read_arrays(self, ticker: str):
+        path = self._path(ticker)
+        dates = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+        close = np.load(os.path.join(path, "close.npy"), mmap_mode="r")
+        return dates, close
+
+    def _write_arrays(self, ticker: str, dates: np.ndarray, close: np.ndarray):
+        path = self._path(ticker)
+        os.makedirs(path, exist_ok=True)
+        for name, values in (("dates", dates), ("close", close)):
+            target = os.path.join(path, f"{name}.npy")
+            tmp = f"{target}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, values)
+            os.replace(tmp, target)
+
+    def _download(self, ticker: str, start: str, end: str, downloader) -> tuple[np.ndarray, np.ndarray]:
+        df = downloader(ticker, start, end)
+        if df is None or df.empty or "Close" not in df.columns:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=float)
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        dates = index.as_unit("ns").asi8
+        close = df["Close"].to_numpy(dtype=float)
+        return dates, close
+
+    def get(self, ticker: str, start_date: str, end_date: str, downloader=None) -> pd.DataFrame:
+        """Daily closes of ticker in [start_date, end_date), topping up the cache if needed"""
+
+        downloader = downloader or self.downloader
+        start = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+        end = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+        today = dt.date.today().strftime("%Y-%m-%d")
+
+        with self._ticker_lock(ticker):
+            meta = self._read_meta(ticker)
+            if meta is not None and not self.offline and time.time() - meta["fetched_at"] > self.ttl:
+                meta = None #expired, download the whole range again
+
+            if meta is None:
+                dates = np.empty(0, dtype=np.int64)
+                close = np.empty(0, dtype=float)
+                covered = None
+            else:
+                dates, close = self._read_arrays(ticker)
+                covered = (meta["start"], meta["end"])
+
+            #gaps recently downloaded without any bar, [start, end, checked_at]
+            now = time.time()
+            empty = [gap for gap in (meta or {}).get("empty", []) if now - gap[2] < self.empty_ttl]
+
+            #date ranges that are missing from the cache
+            missing = []
+            if covered is None:
+                missing.append((start, end))
+            else:
+                if start < covered[0]:
+                    missing.append((start, covered[0]))
+                if end > covered[1] and covered[1] < today:
+                    missing.append((covered[1], end))
+            missing = [(lo, hi) for lo, hi in missing
+                       if not any(e_lo <= lo and hi <= e_hi for e_lo, e_hi, _ in empty)]
+
+            if missing and not self.offline:
+                if downloader is None:
+                    raise RuntimeError("PriceCache has no downloader configured")
+
+                parts_dates = [np.asarray(dates)]
+                parts_close = [np.asarray(close)]
+                new_start, new_end = covered if covered else (None, None)
+                for gap_start, gap_end in missing:
+                    new_dates, new_close = self._download(ticker, gap_start, gap_end, downloader)
+                    if not len(new_dates):
+                        #no bars is not coverage, but the answer holds for a while; a ticker that is
+                        #not cached at all is retried every time (an unknown ticker also comes back empty)
+                        if covered:
+                            empty.append([gap_start, gap_end, now])
+                        continue
+                    parts_dates.append(new_dates)
+                    parts_close.append(new_close)
+                    new_start = min(new_start, gap_start) if new_start else gap_start
+                    new_end = max(new_end, gap_end) if new_end else gap_end
+
+                if len(parts_dates) > 1:
+                    all_dates = np.concatenate(parts_dates)
+                    all_close = np.concatenate(parts_close)
+                    #keep the most recent download when ranges overlap
+                    _, last = np.unique(all_dates[::-1], return_index=True)
+                    keep = len(all_dates) - 1 - last
+                    dates, close = all_dates[keep], all_close[keep]
+
+                    #bars from today on may still change, so they never count as covered
+                    new_end = min(new_end, today)
+                    fetched_at = meta["fetched_at"] if meta is not None else time.time()
+
+                    self._write_arrays(ticker, dates, close)
+                    meta = {"start": new_start, "end": new_end, "fetched_at": fetched_at}
+
+            if meta is not None:
+                meta["empty"] = empty
+                meta["last_access"] = now
+                self._write_meta(ticker, meta)
+
+            lo = np.searchsorted(dates, pd.Timestamp(start).value, side="left")
+            hi = np.searchsorted(dates, pd.Timestamp(end).value, side="left")
+            index = pd.DatetimeIndex(np.asarray(dates[lo:hi]).astype("datetime64[ns]"), name="Date")
+            result = pd.DataFrame({"Close": np.array(close[lo:hi])}, index=index)
+
+        if missing and not self.offline:
+            self.evict()
+        return result
+
+    def entries(self) -> dict:
+        """{ticker directory: (size in bytes, last access time)} for every cached ticker"""
+
+        out = {}
+        if not os.path.isdir(self.directory):
+            return out
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            meta = self._read_meta(name) or {}
+            out[name] = (size, meta.get("last_access", 0.0))
+        return out
+
+    def evict(self):
+        """Drop least recently used tickers until the cache fits in max_bytes"""
+
+        entries = self.entries()
+        total = sum(size for size, _ in entries.values())
+        for name, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            with self._ticker_lock(name):
+                shutil.rmtree(self._path(name), ignore_errors=True)
+            total -= size
+
+    def clear(self, ticker: str | None = None):
+        """Remove one ticker, or the whole cache"""
+
+        if ticker is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        else:
+            with self._ticker_lock(ticker):
+                shutil.rmtree(self._path(ticker), ignore_errors=True)
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """Process-wide in-memory store of daily closes, shared by every session of the app.
+
+    One entry per ticker: read-only dates (datetime64[ns]) and closes (float64) arrays
+    covering a date range [start, end). A request inside that range is served as a DataFrame
+    over views of the arrays (no copy, pandas copies on write); a request outside it loads
+    the union of both ranges and replaces the entry, so a ticker is held once whatever
+    ranges the sessions ask for.
+
+    Loads are serialized per ticker: concurrent requests for the same ticker wait for the
+    first one's load instead of starting their own. Other tickers are not blocked.
+
+    max_bytes: memory cap, least recently used tickers are evicted first.
+    ttl: entries older than this (seconds) are loaded again, like PriceCache entries.
+    hits / misses / loads / evictions are counted, see stats().
+    """
+
+    def __init__(self, max_bytes: int = 256*1024**2, ttl: float = 24*3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict() #ticker -> (start, end, dates, close, loaded_at)
+        self._lock = threading.Lock()
+        self._ticker_locks = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._ticker_locks.setdefault(ticker, threading.Lock())
+
+    def _lookup(self, ticker: str, start: str, end: str):
+        """Arrays of ticker if they cover [start, end), else None"""
+
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None or time.time() - entry[4] > self.ttl or start < entry[0] or end > entry[1]:
+                return None
+            self._entries.move_to_end(ticker)
+            self.hits += 1
+            return entry
+
+    def _store(self, ticker: str, entry: tuple):
+        size = entry[2].nbytes + entry[3].nbytes
+        with self._lock:
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self.bytes -= old[2].nbytes + old[3].nbytes
+            if size > self.max_bytes:
+                return #would evict everything else and still not fit
+            self._entries[ticker] = entry
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, dates, close, _) = self._entries.popitem(last=False)
+                self.bytes -= dates.nbytes + close.nbytes
+                self.evictions += 1
+
+    def get(self, ticker: str, start_date: str, end_date: str, load) -> pd.DataFrame:
+        """Daily closes of ticker in [start_date, end_date) as a read-only backed DataFrame.
+
+        load(ticker, start_date, end_date) -> DataFrame with a "Close" column and a sorted
+        datetime index, called on a miss (for a range that may be wider than requested).
+        """
+
+        start = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+        end = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+
+        entry = self._lookup(ticker, start, end)
+        if entry is None:
+            with self._ticker_lock(ticker):
+                entry = self._lookup(ticker, start, end) #loaded by another session while we waited
+                if entry is None:
+                    with self._lock:
+                        self.misses += 1
+                        old = self._entries.get(ticker)
+                    if old is not None and time.time() - old[4] <= self.ttl:
+                        start, end = min(start, old[0]), max(end, old[1])
+                    entry = self._load(ticker, start, end, load)
+                    if len(entry[2]): #an empty load (failure, unknown ticker) is retried on the next call
+                        self._store(ticker, entry)
+
+        _, _, dates, close, _ = entry
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date), "ns"), side="left")
+        hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date), "ns"), side="left")
+        index = pd.DatetimeIndex(dates[lo:hi], name="Date", copy=False)
+        return pd.DataFrame({"Close": close[lo:hi]}, index=index, copy=False)
+
+    def _load(self, ticker: str, start: str, end: str, load) -> tuple:
+        df = load(ticker, start, end)
+        with self._lock:
+            self.loads += 1
+
+        if df is None or df.empty or "Close" not in df.columns:
+            dates = np.empty(0, dtype="datetime64[ns]")
+            close = np.empty(0, dtype=float)
+        else:
+            dates = np.array(pd.DatetimeIndex(df.index).as_unit("ns").values)
+            close = df["Close"].to_numpy(dtype=float, copy=True)
+        dates.flags.writeable = False
+        close.flags.writeable = False
+        return (start, end, dates, close, time.time())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tickers": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+            }
@@ -0,0 +1,93 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def make_key(*parts) -> str:
+    """Stable hash of the inputs of a computation (tickers, dates, strategy name, parameters...)"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def _size_of(value) -> int:
+    """Approximate memory footprint of a cached value (DataFrames/Series and containers of them)"""
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, (tuple, list)):
+        return sum(_size_of(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_size_of(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by the memory of its values (max_bytes).
+
+    Values are shared between callers, treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 256*1024**2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() #key -> (value, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key: str, value):
+        size = _size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return #would evict everything else and still not fit
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute):
+        """Cached value for key, computing and storing it on a miss"""
+
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits/lookups if lookups else 0.0,
+            }
+
+
+_MISSING = object()
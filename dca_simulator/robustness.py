@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .metrics import KEY_METRICS_DTYPE, key_metrics_batch
+from .strategies import run_strategy
+
+
+WINDOW_STRATEGIES = ("DCA", "Double Down DCA", "Lump Sum", "SMA Momentum", "SMA Mean Reversion")
+
+
+def rolling_start_analysis(df: pd.DataFrame, horizon_years: int = 10, monthly_contrib: float = 150,
+                           strategies=WINDOW_STRATEGIES, step: int = 1, **params) -> pd.DataFrame:
+    """Run each strategy for every possible start month over a fixed horizon.
+
+    Each strategy runs once over the full history to get its monthly contribution vector
+    (signals such as the 252-day high or the SMA are therefore already warmed up at every
+    window start). Shares and invested amounts of a window are differences of prefix sums
+    of that vector, so the ~600 overlapping windows of a 50-year series cost one backtest
+    plus array work, drawdown and IRR are computed for all windows at once on a
+    (windows x months) view.
+
+    Value Averaging targets depend on the start month and are not supported.
+    params are passed to the strategies that accept them (DD_threshold, sma_period).
+    Returns one row per (strategy, start month) with the key_metrics fields.
+    """
+
+    if "Value Averaging" in strategies:
+        raise ValueError("Value Averaging is path dependent and cannot be evaluated with prefix sums")
+
+    horizon = int(horizon_years*12)
+    columns = ["strategy", "start", "end", *KEY_METRICS_DTYPE.names]
+
+    monthly = df["Close"].resample("MS").first()
+    close = monthly.to_numpy(dtype=float)
+    n_windows = len(close) - horizon + 1
+    if horizon < 1 or n_windows < 1:
+        return pd.DataFrame(columns=columns)
+
+    starts = np.arange(0, n_windows, step)
+    ends = starts + horizon - 1
+    years = (monthly.index[ends] - monthly.index[starts]).days.to_numpy()/365
+    close_win = sliding_window_view(close, horizon)[starts] #(windows x months), no copy
+
+    results = []
+    for name in strategies:
+        if name == "Lump Sum":
+            #the whole horizon's capital is invested at the window start
+            capital = horizon*monthly_contrib
+            shares = np.broadcast_to((capital/close[starts])[:, None], close_win.shape)
+            invested = np.full(close_win.shape, capital)
+        else:
+            full = run_strategy(name, df, monthly_contrib=monthly_contrib, **params)
+            contributions = np.diff(full["invested_total"].to_numpy(dtype=float), prepend=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                bought = np.where(contributions != 0, contributions/close, 0.0)
+
+            #prefix sums with a leading 0, window [s, s+h) = P[s+1 : s+h+1] - P[s]
+            shares = _window_sums(bought, starts, horizon)
+            invested = _window_sums(contributions, starts, horizon)
+
+        metrics = key_metrics_batch(shares*close_win, invested, years)
+        frame = pd.DataFrame(metrics)
+        frame.insert(0, "strategy", name)
+        frame.insert(1, "start", monthly.index[starts])
+        frame.insert(2, "end", monthly.index[ends])
+        results.append(frame)
+
+    return pd.concat(results, ignore_index=True)
+
+
+def _window_sums(values: np.ndarray, starts: np.ndarray, horizon: int) -> np.ndarray:
+    """Running sums of values inside each window [s, s+horizon), (windows x months).
+
+    NaN months (a month without bars) are summed as 0 and counted separately, so a gap only
+    turns the windows that contain it NaN, from the gap on, like a backtest over that window.
+    """
+
+    missing = np.isnan(values)
+    prefix = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+    sums = sliding_window_view(prefix[1:], horizon)[starts] - prefix[starts, None]
+    in_gap = sliding_window_view(gaps[1:], horizon)[starts] > gaps[starts, None]
+    return np.where(in_gap, np.nan, sums)
+
+
+def summarize_windows(results: pd.DataFrame, fields=("CAGR", "IRR", "max_drawdown"),
+                      percentiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+    """Distribution of the rolling-window results per strategy (mean, min, percentiles, max)"""
+
+    return results.groupby("strategy", sort=False)[list(fields)].describe(percentiles=list(percentiles))
@@ -0,0 +1,228 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .file_source import FileSource
+from .indicators import IndicatorCache
+from .metrics import KEY_METRICS_DTYPE, key_metrics
+from .strategies import STRATEGIES, run_strategy
+
+logger = logging.getLogger(__name__)
+
+
+#set in every worker process by _init_worker
+_worker = {}
+
+
+def _init_worker(shm_name: str, shape: tuple, dates: np.ndarray):
+    """Attach the shared price array once per worker process"""
+
+    #pool workers share the parent's resource tracker, the parent unlinks the block when the run is done
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker["shm"] = shm
+    _worker["prices"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker["dates"] = pd.DatetimeIndex(dates, name="Date")
+
+
+def _backtest_ticker(ticker: str, close: np.ndarray, dates: pd.DatetimeIndex, strategies, params: dict) -> list[dict]:
+    """Run every strategy on one ticker's close series and return one metrics row per strategy"""
+
+    valid = ~np.isnan(close) #before listing / after delisting
+    if not valid.any():
+        return []
+    df = pd.DataFrame({"Close": close[valid]}, index=dates[valid])
+
+    indicators = IndicatorCache() #rolling windows and the monthly resample shared by the strategies
+    rows = []
+    for name in strategies:
+        metrics = key_metrics(run_strategy(name, df, indicators=indicators, **params))
+        row = {"ticker": ticker, "strategy": name}
+        row.update({field: float(metrics[field]) for field in KEY_METRICS_DTYPE.names})
+        rows.append(row)
+    return rows
+
+
+def _run_chunk(columns: list[int], tickers: list[str], strategies, params: dict) -> list[dict]:
+    prices = _worker["prices"]
+    rows = []
+    for j, ticker in zip(columns, tickers):
+        rows.extend(_backtest_ticker(ticker, np.array(prices[j]), _worker["dates"], strategies, params))
+    return rows
+
+
+def run_universe(prices: pd.DataFrame, strategies=tuple(STRATEGIES), max_workers: int | None = None,
+                 chunksize: int | None = None, **params) -> pd.DataFrame:
+    """Backtest every strategy independently on every ticker of a wide price frame.
+
+    prices: output of load_multiple_price_data (a Date column, or a Date index, and one
+    column per ticker; a Portfolio column is ignored). params are passed to each strategy
+    that accepts them (monthly_contrib, DD_threshold, sma_period, goal_monthly_growth).
+
+    Tickers are split in chunks over a ProcessPoolExecutor. The (tickers x dates) price
+    array is placed in shared memory once, so workers only receive column positions
+    instead of pickled DataFrames. max_workers=1 runs in the current process.
+
+    Returns a tidy frame: one row per (ticker, strategy) with the key_metrics fields.
+    """
+
+    if "Date" in prices.columns:
+        prices = prices.set_index("Date")
+    prices = prices.drop(columns=["Portfolio"], errors="ignore")
+
+    tickers = [str(c) for c in prices.columns]
+    dates = pd.DatetimeIndex(prices.index).values
+    columns = ["ticker", "strategy", *KEY_METRICS_DTYPE.names]
+    if not tickers:
+        return pd.DataFrame(columns=columns)
+
+    #(tickers x dates) so each ticker's history is one contiguous row
+    values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64).T)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1:
+        index = pd.DatetimeIndex(dates, name="Date")
+        rows = []
+        for j, ticker in enumerate(tickers):
+            rows.extend(_backtest_ticker(ticker, values[j], index, strategies, params))
+        return pd.DataFrame(rows, columns=columns)
+
+    if chunksize is None:
+        chunksize = max(1, len(tickers)//(max_workers*4)) #a few chunks per worker to balance uneven histories
+
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)[:] = values
+        del values
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shm.name, (len(tickers), len(dates)), dates)) as pool:
+            futures = []
+            for start in range(0, len(tickers), chunksize):
+                chunk = range(start, min(start + chunksize, len(tickers)))
+                futures.append(pool.submit(_run_chunk, list(chunk), tickers[chunk.start:chunk.stop],
+                                           tuple(strategies), params))
+            rows = [row for future in futures for row in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(rows, columns=columns)
+
+
+#FileSource of each (path, date column, close column) opened in this process, see _stream_batch
+_sources = {}
+
+
+def _stream_batch(source: tuple, tickers: list[str], start_date, end_date, strategies, params: dict) -> list[dict]:
+    """Read one batch of tickers from the archive and backtest them; runs in a worker process,
+    so only the source's path and the ticker names are sent, not prices"""
+
+    if source not in _sources:
+        _sources[source] = FileSource(*source, cache=False) #a wide CSV is not kept whole in every worker
+    prices = _sources[source].read_many(tickers, start_date, end_date)
+    rows = []
+    for ticker in tickers:
+        rows.extend(_backtest_ticker(ticker, prices[ticker].to_numpy(dtype=np.float64), prices.index, strategies, params))
+    return rows
+
+
+class _ResultWriter:
+    """Appends result rows to a CSV file, or to a Parquet file one row group per batch (needs pyarrow)"""
+
+    def __init__(self, path: str, columns: list[str]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self._parquet = None
+        if path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._schema = pa.schema([(name, pa.string() if name in ("ticker", "strategy") else pa.float64()) for name in columns])
+            self._parquet = pq.ParquetWriter(path, self._schema)
+        else:
+            pd.DataFrame(columns=columns).to_csv(path, index=False)
+
+    def write(self, rows: list[dict]):
+        frame = pd.DataFrame(rows, columns=self.columns)
+        if self._parquet is not None:
+            import pyarrow as pa
+            self._parquet.write_table(pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+        else:
+            frame.to_csv(self.path, mode="a", header=False, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def stream_universe(source: FileSource | str, output: str, tickers: list[str] | None = None, start_date: str | None = None,
+                    end_date: str | None = None, strategies=tuple(STRATEGIES), batch_size: int = 100,
+                    max_workers: int = 1, progress=None, **params) -> int:
+    """Backtest every strategy on every ticker of a local price archive that may not fit in memory,
+    like run_universe but out of core.
+
+    source: a FileSource or its path (a folder with a file per ticker, or a wide file), tickers
+    defaults to every ticker it has. Tickers are read batch_size at a time over
+    [start_date, end_date), backtested and appended to output (.parquet, needs pyarrow, or CSV),
+    so at most one batch of prices and of result rows per worker is in memory whatever the size
+    of the universe. With max_workers > 1 each worker process reads its own batches; at most two
+    batches per worker are in flight and the results are written in ticker order.
+    progress(done, total) is called with the number of tickers written after each batch.
+
+    A wide CSV cannot be read by column: every batch parses the whole file and keeps only its
+    columns, so memory stays bounded but the file is parsed once per batch. Convert it to Parquet
+    or Arrow for large universes.
+
+    Returns the number of rows written (one per ticker and strategy, run_universe's columns).
+    """
+
+    if isinstance(source, str):
+        source = FileSource(source, cache=False)
+    if source.wide and source.path.lower().endswith(".csv"):
+        logger.warning("%s is a wide CSV: every batch parses the whole file, convert it to Parquet or Arrow "
+                       "to read only the batch's columns", source.path)
+    tickers = source.tickers() if tickers is None else list(dict.fromkeys(tickers))
+    missing = [ticker for ticker in tickers if ticker not in source]
+    if missing:
+        raise KeyError(f"{', '.join(missing)} not in {source.path}")
+
+    spec = (source.path, source.date_column, source.close_column)
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    args = (start_date, end_date, tuple(strategies), params)
+    writer = _ResultWriter(output, ["ticker", "strategy", *KEY_METRICS_DTYPE.names])
+    done = 0
+
+    def write(batch, rows):
+        nonlocal done
+        writer.write(rows)
+        done += len(batch)
+        if progress is not None:
+            progress(done, len(tickers))
+
+    try:
+        if max_workers == 1:
+            for batch in batches:
+                write(batch, _stream_batch(spec, batch, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                pending = deque()
+                for batch in batches:
+                    pending.append((batch, pool.submit(_stream_batch, spec, batch, *args)))
+                    if len(pending) >= 2*max_workers: #bounded: do not queue the whole universe's results
+                        batch, future = pending.popleft()
+                        write(batch, future.result())
+                while pending:
+                    batch, future = pending.popleft()
+                    write(batch, future.result())
+    finally:
+        writer.close()
+    return writer.rows
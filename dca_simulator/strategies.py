@@ -1,194 +1,216 @@
-import pandas as pd
+import inspect
+import numpy as np
+from .backtest import TRADING_DAYS_PER_MONTH, Strategy, TargetValueStrategy, trailing
 
 
-def dca_DD(df, monthly_contrib: float, DD_threshold: float=0.15):
-    """Double Down Dollar-Cost Averaging (DD_DCA): Investing monthly_contrib, 
-    unless the price is 15% below the rolling 1-year high,
-    then invest 2x monthly_contrib"""
+class DoubleDownDCA(Strategy):
+    """Invest monthly_contrib, or 2x monthly_contrib when the price is DD_threshold below the rolling 1-year high"""
 
-    df = df.copy()
+    name = "Double Down DCA"
+    lookback = 252 #252 trading days in a year
 
-    df["12m_high"] = df["Close"].rolling(252).max() #252 trading days in a year
-    df["drawdown"] = df["Close"]/df["12m_high"]
-    df["DD_cond"] = df["drawdown"] <= (1-DD_threshold) #This is True when the stock is >=15% down from 12m_high
+    def __init__(self, monthly_contrib: float, DD_threshold: float = 0.15):
+        self.monthly_contrib = monthly_contrib
+        self.DD_threshold = DD_threshold
 
-    
+    def signals(self, df, indicators):
+        high = indicators.rolling_max(df, "Close", self.lookback)
+        drawdown = df["Close"]/high
+        return {
+            "12m_high": high,
+            "drawdown": drawdown,
+            "DD_cond": drawdown <= (1-self.DD_threshold), #This is True when the stock is >=15% down from 12m_high
+        }
 
-    monthly_investments = df.resample("MS").first() #because if we specify an exact date manually it could be a non-trading day
-    #we buy at the first trading day of each month
-    monthly_investments["DD_cond"] = df["DD_cond"].resample("MS").first()
+    def contributions(self, monthly):
+        #doubling the contribution every time the price drops DD_threshold from rolling high
+        #(a month without a DD_cond value counts as a drawdown month, like a truthy NaN would)
+        multiplier = np.where(monthly["DD_cond"].fillna(True).astype(bool), 2, 1)
+        return self.monthly_contrib*multiplier
 
+    def contributions_batch(self, paths):
+        #the 1-year high of month starts, no double down before a year of history (like the daily window)
+        high = trailing(paths, self.lookback//TRADING_DAYS_PER_MONTH, np.max)
+        with np.errstate(invalid="ignore"):
+            double = paths/high <= (1 - self.DD_threshold)
+        return np.where(double, 2.0, 1.0)*self.monthly_contrib
 
-    shares_total = 0
-    invested_total = 0
 
-    for date, row in monthly_investments.iterrows():
-        multiplier = 2 if row["DD_cond"] else 1
-        investment_amount = monthly_contrib * multiplier
-        #doubling the contribution every time the price drops 20% from rolling high
+class DCA(Strategy):
+    """Invest monthly_contrib on the first trading day of every month"""
 
-        shares_bought = investment_amount/row["Close"]
-        shares_total += shares_bought
-        invested_total += investment_amount
+    name = "DCA"
 
-        monthly_investments.loc[date, 'shares_total'] = shares_total
-        monthly_investments.loc[date, 'invested_total'] = invested_total
-        monthly_investments.loc[date, 'portf_value'] = shares_total * row['Close']
+    def __init__(self, monthly_contrib: float):
+        self.monthly_contrib = monthly_contrib
 
+    def contributions(self, monthly):
+        return np.full(len(monthly), self.monthly_contrib, dtype=float)
 
-    #Profit/Loss
-    monthly_investments['profit_loss'] = monthly_investments['portf_value'] - monthly_investments['invested_total']
-    
+    def contributions_batch(self, paths):
+        return np.full(paths.shape, float(self.monthly_contrib))
 
-    return monthly_investments
 
-    
+class LumpSum(Strategy):
+    """Invest the capital DCA would use over the whole period (months x monthly_contrib) at the start"""
 
-def dca_standard(df, monthly_contrib: float):
-    """Standard Dollar-Cost Averaging (DCA)"""
+    name = "Lump Sum"
+    horizon_dependent = True #the first month invests the capital of every month
 
-    df = df.copy()
+    def __init__(self, monthly_contrib: float):
+        self.monthly_contrib = monthly_contrib
 
-    monthly_investments = df.resample("MS").first() #because if we specify an exact date manually it could be a non-trading day
-    #we buy at the first trading day of each month
+    def contributions(self, monthly):
+        amounts = np.zeros(len(monthly))
+        amounts[0] = len(monthly)*self.monthly_contrib #so that the strategy uses the same amount of capital as Normal DCA
+        return amounts
 
+    def contributions_batch(self, paths):
+        amounts = np.zeros(paths.shape)
+        amounts[:, 0] = paths.shape[1]*self.monthly_contrib
+        return amounts
 
-    shares_total = 0
-    invested_total = 0
 
-    for date, row in monthly_investments.iterrows():
-        investment_amount = monthly_contrib
-    
+class SMAMomentum(Strategy):
+    """Invest monthly_contrib only when the price is above the sma_period-day Simple Moving Average"""
 
-        shares_bought = investment_amount/row["Close"]
-        shares_total += shares_bought
-        invested_total += investment_amount
+    name = "SMA Momentum"
 
-        monthly_investments.loc[date, 'shares_total'] = shares_total
-        monthly_investments.loc[date, 'invested_total'] = invested_total
-        monthly_investments.loc[date, 'portf_value'] = shares_total * row['Close']
+    def __init__(self, monthly_contrib: float, sma_period: int = 90):
+        self.monthly_contrib = monthly_contrib
+        self.sma_period = sma_period
 
+    @property
+    def lookback(self):
+        return self.sma_period
 
-    #Profit/Loss
-    monthly_investments['profit_loss'] = monthly_investments['portf_value'] - monthly_investments['invested_total']
-    
+    def condition(self, close, sma):
+        return close > sma #we invest during uptrends, when momentum is high
 
-    return monthly_investments
+    def signals(self, df, indicators):
+        sma = indicators.rolling_mean(df, "Close", self.sma_period) #shared by momentum and mean reversion
+        return {"sma": sma, "above_sma": self.condition(df["Close"], sma)}
 
+    def contributions(self, monthly):
+        invest = monthly["above_sma"].fillna(False).astype(bool).to_numpy()
+        return np.where(invest, self.monthly_contrib, 0)
 
+    def contributions_batch(self, paths):
+        #the SMA of the month starts the sma_period window spans (at least 2), no signal before it is filled
+        sma = trailing(paths, max(2, round(self.sma_period/TRADING_DAYS_PER_MONTH)), np.mean)
+        with np.errstate(invalid="ignore"):
+            invest = self.condition(paths, sma)
+        return np.where(invest, float(self.monthly_contrib), 0.0)
 
-def lump_sum(df, monthly_contrib: float):
-    "Lump Sum investment strategy: invest all money at the beginning date"
-    "monthly_contrib is used as to calculate the total amount that should be invested as a lump sum to be comparable to the Normal DCA"
 
-    df = df.copy()
-    monthly_investments = df.resample("MS").first()
+class SMAMeanReversion(SMAMomentum):
+    """Invest monthly_contrib only when the price is below the sma_period-day Simple Moving Average"""
 
-    total_months = len(monthly_investments)
-    total_capital = total_months*monthly_contrib #so that the strategy uses the same amount of capital as Normal DCA
-    
-    first_price = monthly_investments.loc[monthly_investments.index[0], "Close"]
-    
-    shares_total = total_capital/first_price
+    name = "SMA Mean Reversion"
 
-    
-    monthly_investments["shares_total"] = shares_total
-    monthly_investments["invested_total"] = total_capital
-    monthly_investments["portf_value"] = shares_total*monthly_investments["Close"]
-    monthly_investments["profit_loss"] = (monthly_investments["portf_value"] - total_capital)
+    def condition(self, close, sma):
+        return close < sma #negative exposure to momentum (mean reversion)
 
 
-    return monthly_investments
+class ValueAveraging(TargetValueStrategy):
+    """Grow the portfolio value along monthly_contrib*(1+i)*(1+goal_monthly_growth)**i,
+    investing the shortfall each month and nothing when ahead"""
 
+    name = "Value Averaging"
 
+    def __init__(self, goal_monthly_growth: float = 0.006, monthly_contrib: float = 1000):
+        self.goal_monthly_growth = goal_monthly_growth
+        self.monthly_contrib = monthly_contrib
 
-def dca_sma_mom(df, monthly_contrib: float, sma_period: int = 90):
-    """Simple Moving Average DCA
-    Invest an amount (monthly_contrib) only when the price is above the X-day Simple Moving Average, investing in momentum"""
+    def targets(self, monthly, first_month=0):
+        return self.goals(len(monthly), first_month)
 
-    df = df.copy()
-    df["sma"] = df["Close"].rolling(sma_period).mean()
-    df["above_sma"] = df["Close"] > df["sma"] #we invest during uptrends, when momentum is high
+    def targets_batch(self, paths):
+        return self.goals(paths.shape[1]) #the same goals on every path
 
-    monthly_investments = df.resample("MS").first()
-    monthly_investments["above_sma"] = df["above_sma"].resample("MS").first()
+    def goals(self, n_months: int, start: int = 0) -> np.ndarray:
+        """Goal value of each of n_months months, from month start on"""
+        #python floats (not np.power) so the goals are exactly those of the original loop
+        return np.array([self.monthly_contrib*(1+i)*(1+self.goal_monthly_growth)**i for i in range(start, start + n_months)],
+                        dtype=float)
 
-    shares_total = 0
-    invested_total = 0
 
-    for date, row in monthly_investments.iterrows():
-        if row["above_sma"] == True:
-            shares_bought = monthly_contrib/row["Close"]
-            shares_total += shares_bought
-            invested_total += monthly_contrib
 
-        monthly_investments.loc[date, "shares_total"] = shares_total
-        monthly_investments.loc[date, "invested_total"] = invested_total
-        monthly_investments.loc[date, "portf_value"] = shares_total*row["Close"]
+def dca_DD(df, monthly_contrib: float, DD_threshold: float=0.15, indicators=None):
+    """Double Down Dollar-Cost Averaging (DD_DCA): Investing monthly_contrib, 
+    unless the price is 15% below the rolling 1-year high,
+    then invest 2x monthly_contrib"""
+
+    return DoubleDownDCA(monthly_contrib, DD_threshold).run(df, indicators)
+
     
-    monthly_investments["profit_loss"] = monthly_investments["portf_value"] - monthly_investments["invested_total"]
 
+def dca_standard(df, monthly_contrib: float, indicators=None):
+    """Standard Dollar-Cost Averaging (DCA)"""
+
+    return DCA(monthly_contrib).run(df, indicators)
+
+
+
+def lump_sum(df, monthly_contrib: float, indicators=None):
+    "Lump Sum investment strategy: invest all money at the beginning date"
+    "monthly_contrib is used as to calculate the total amount that should be invested as a lump sum to be comparable to the Normal DCA"
 
-    return monthly_investments
+    return LumpSum(monthly_contrib).run(df, indicators)
 
 
 
-def dca_sma_mean_rev(df, monthly_contrib: float, sma_period: int = 90):
+def dca_sma_mom(df, monthly_contrib: float, sma_period: int = 90, indicators=None):
     """Simple Moving Average DCA
-    Invest an amount (monthly_contrib) only when the price is above the X-day Simple Moving Average"""
-
-    df = df.copy()
-    df["sma"] = df["Close"].rolling(sma_period).mean()
-    df["above_sma"] = df["Close"] < df["sma"] #negative exposure to momentum (mean reversion)
-    monthly_investments = df.resample("MS").first()
-    monthly_investments["above_sma"] = df["above_sma"].resample("MS").first() ########do we actually need those two lines
-
-    shares_total = 0
-    invested_total = 0
-
-    for date, row in monthly_investments.iterrows():
-        if row["above_sma"] == True:
-            shares_bought = monthly_contrib/row["Close"]
-            shares_total += shares_bought
-            invested_total += monthly_contrib
-
-        monthly_investments.loc[date, "shares_total"] = shares_total
-        monthly_investments.loc[date, "invested_total"] = invested_total
-        monthly_investments.loc[date, "portf_value"] = shares_total*row["Close"]
-    
-    monthly_investments["profit_loss"] = monthly_investments["portf_value"] - monthly_investments["invested_total"]
+    Invest an amount (monthly_contrib) only when the price is above the X-day Simple Moving Average, investing in momentum"""
+
+    return SMAMomentum(monthly_contrib, sma_period).run(df, indicators)
 
 
-    return monthly_investments
+
+def dca_sma_mean_rev(df, monthly_contrib: float, sma_period: int = 90, indicators=None):
+    """Simple Moving Average DCA
+    Invest an amount (monthly_contrib) only when the price is below the X-day Simple Moving Average"""
+
+    return SMAMeanReversion(monthly_contrib, sma_period).run(df, indicators)
 
 
-def value_averaging(df, goal_monthly_growth: float=0.006, monthly_contrib = 1000):
+def value_averaging(df, goal_monthly_growth: float=0.006, monthly_contrib = 1000, indicators=None):
     """Value Averaging: portfolio attempts to grow at a constant rate (~0.6%/month = 7.44%/year),
     Invest when below the goal, do not invest when above"""
 
-    df = df.copy()
-    monthly_investments = df.resample("MS").first()
+    return ValueAveraging(goal_monthly_growth, monthly_contrib).run(df, indicators)
+        
 
-    shares_total = 0
-    invested_total = 0
 
-    for i, (date, row) in enumerate(monthly_investments.iterrows()):
-        goal_val = monthly_contrib*(1+i)*(1+goal_monthly_growth)**i
-        current_val = shares_total * row["Close"]
 
-        investment_this_month = max(goal_val - current_val, 0) #we invest if we are behind target and do nothing if we are on track/ahead
+#names used in the app's results and metrics table
+STRATEGIES = {
+    "DCA": dca_standard,
+    "Double Down DCA": dca_DD,
+    "Lump Sum": lump_sum,
+    "SMA Momentum": dca_sma_mom,
+    "SMA Mean Reversion": dca_sma_mean_rev,
+    "Value Averaging": value_averaging,
+}
 
-        if investment_this_month > 0:
-            shares_bought = investment_this_month / row["Close"]
-            shares_total += shares_bought
-            invested_total += investment_this_month
-        
-        monthly_investments.loc[date, "shares_total"] = shares_total
-        monthly_investments.loc[date, "invested_total"] = invested_total
-        monthly_investments.loc[date, "portf_value"] = shares_total*row["Close"]
 
-    monthly_investments["profit_loss"] = monthly_investments["portf_value"] - monthly_investments["invested_total"]
+#the rule behind each name, see make_strategy
+STRATEGY_CLASSES = {cls.name: cls for cls in (DCA, DoubleDownDCA, LumpSum, SMAMomentum, SMAMeanReversion, ValueAveraging)}
 
 
-    return monthly_investments
-        
+def make_strategy(name: str, **params):
+    """Strategy object of a name, built from the parameters it accepts with run_strategy's defaults"""
+
+    strategy = STRATEGY_CLASSES[name]
+    accepted = inspect.signature(strategy).parameters
+    return strategy(**{key: value for key, value in params.items() if key in accepted})
+
+
+def run_strategy(name: str, df, **params):
+    """Run a strategy by name, passing only the parameters it accepts
+    (monthly_contrib, DD_threshold, sma_period, goal_monthly_growth, indicators)"""
+
+    strategy = STRATEGIES[name]
+    accepted = inspect.signature(strategy).parameters
+    return strategy(df, **{key: value for key, value in params.items() if key in accepted})
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from .metrics import key_metrics_batch
+
+
+SWEEP_STRATEGIES = ("DCA", "Double Down DCA", "Lump Sum", "SMA Momentum", "SMA Mean Reversion")
+
+
+def _month_start_positions(df: pd.DataFrame, month_index: pd.DatetimeIndex) -> np.ndarray:
+    """Row position of the first trading day of each month in month_index (-1 for months without data)"""
+
+    positions = df.index.searchsorted(month_index)
+    next_month = month_index + pd.offsets.MonthBegin(1)
+    in_month = positions < len(df.index)
+    in_month[in_month] = df.index[positions[in_month]] < next_month[in_month]
+    return np.where(in_month, positions, -1)
+
+
+def _unit_results(close: np.ndarray, units: np.ndarray) -> dict:
+    """Accounting for a batch of contribution patterns at 1$ per unit.
+    units has shape (n_configs, n_months); returns one value per config"""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares_bought = np.where(units != 0, units/close, 0.0)
+    shares_total = np.cumsum(shares_bought, axis=1)
+    invested_total = np.cumsum(units, axis=1)
+    portf_value = shares_total*close
+
+    metrics = key_metrics_batch(portf_value, invested_total, years=np.nan) #years only feed CAGR, not returned here
+    return {
+        "final_value": metrics["final_value"],
+        "invested_total": metrics["invested_total"],
+        "max_drawdown": metrics["max_drawdown"],
+        "IRR": metrics["IRR"],
+    }
+
+
+def sweep(df: pd.DataFrame, monthly_contrib, DD_threshold=(0.15,), sma_period=(90,),
+          strategies=SWEEP_STRATEGIES) -> dict:
+    """Evaluate every combination of monthly_contrib x DD_threshold x sma_period in one pass.
+
+    Returns {strategy: {metric: array}} where each array has shape
+    (len(monthly_contrib), len(DD_threshold), len(sma_period)); metrics are
+    final_value, invested_total, max_drawdown (%) and IRR (% per year).
+    Axes a strategy does not depend on are read-only broadcast views.
+
+    The monthly resample, the 252-day rolling high and the price prefix sums used for
+    every SMA period are computed once. Amounts scale linearly with monthly_contrib,
+    drawdown and IRR do not depend on it, so each signal pattern is simulated only once.
+    SMA values come from prefix sums and can differ from rolling().mean() by float rounding.
+    """
+
+    contribs = np.asarray(monthly_contrib, dtype=float).ravel()
+    thresholds = np.asarray(DD_threshold, dtype=float).ravel()
+    periods = np.asarray(sma_period, dtype=int).ravel()
+    shape = (len(contribs), len(thresholds), len(periods))
+
+    unknown = set(strategies) - set(SWEEP_STRATEGIES)
+    if unknown:
+        raise ValueError(f"Strategies not supported by sweep: {sorted(unknown)}")
+
+    monthly_close = df["Close"].resample("MS").first() #same monthly grid as the strategies
+    close = monthly_close.to_numpy(dtype=float)
+    n_months = len(close)
+    positions = _month_start_positions(df, monthly_close.index)
+    has_data = positions >= 0
+
+    daily_close = df["Close"].to_numpy(dtype=float)
+
+    def unit_signal(values):
+        """Daily signal values at the first trading day of each month (NaN for empty months)"""
+        out = np.full(values.shape[:-1] + (n_months,), np.nan)
+        out[..., has_data] = values[..., positions[has_data]]
+        return out
+
+    unit = {}
+    if "DCA" in strategies:
+        unit["DCA"] = (_unit_results(close, np.ones((1, n_months))), None)
+
+    if "Lump Sum" in strategies:
+        units = np.zeros((1, n_months))
+        units[0, 0] = n_months
+        unit["Lump Sum"] = (_unit_results(close, units), None)
+
+    if "Double Down DCA" in strategies:
+        high = df["Close"].rolling(252).max().to_numpy(dtype=float)
+        ratio = unit_signal(daily_close/high)
+        with np.errstate(invalid="ignore"):
+            dd_cond = ratio[None, :] <= (1 - thresholds)[:, None]
+        dd_cond[:, ~has_data] = True #an empty month counts as a drawdown month, like in dca_DD
+        unit["Double Down DCA"] = (_unit_results(close, np.where(dd_cond, 2.0, 1.0)), 1)
+
+    if "SMA Momentum" in strategies or "SMA Mean Reversion" in strategies:
+        prefix = np.concatenate(([0.0], np.cumsum(daily_close)))
+        pos = np.where(has_data, positions, 0)
+        start = pos[None, :] + 1 - periods[:, None]
+        with np.errstate(invalid="ignore"):
+            sma = (prefix[pos + 1][None, :] - prefix[np.maximum(start, 0)])/periods[:, None]
+        sma[(start < 0) | ~has_data[None, :]] = np.nan
+
+        with np.errstate(invalid="ignore"):
+            if "SMA Momentum" in strategies:
+                above = unit_signal(daily_close)[None, :] > sma
+                unit["SMA Momentum"] = (_unit_results(close, above.astype(float)), 2)
+            if "SMA Mean Reversion" in strategies:
+                below = unit_signal(daily_close)[None, :] < sma
+                unit["SMA Mean Reversion"] = (_unit_results(close, below.astype(float)), 2)
+
+    results = {}
+    for name in strategies:
+        metrics, axis = unit[name]
+        per_strategy = {}
+        for metric, values in metrics.items():
+            #reshape so the parameter axis the strategy depends on lines up with the cube
+            cube_shape = [1, 1, 1]
+            if axis is not None:
+                cube_shape[axis] = len(values)
+            values = values.reshape(cube_shape)
+            if metric in ("final_value", "invested_total"):
+                values = values*contribs[:, None, None]
+            per_strategy[metric] = np.broadcast_to(values, shape)
+        results[name] = per_strategy
+
+    return results
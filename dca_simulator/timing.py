@@ -0,0 +1,132 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+#collector of the running simulation, None when timings are off
+_collector = contextvars.ContextVar("dca_simulator_timings", default=None)
+
+
+@contextmanager
+def span(name: str, **fields):
+    """Time a stage of the pipeline (load, download, clean, strategy, irr, plot, ...) if a Timings
+    collector is active in this context; otherwise this only costs a context variable lookup.
+    fields (e.g. ticker=...) are kept with the span in the JSON log."""
+
+    timings = _collector.get()
+    if timings is None:
+        yield
+        return
+    with timings.span(name, **fields):
+        yield
+
+
+class Timings:
+    """Opt-in collector of the spans of one run.
+
+        with Timings("simulation") as timings:
+            ...                      #every span() in this context (and in threads started
+                                     #with a copy of it) is recorded
+        timings.breakdown()          #one row per stage
+        timings.log()                #one JSON line
+
+    Spans can nest (a download inside a load, the IRR inside the metrics), the nested time is
+    included in the parent's. Spans of other threads are recorded when the thread runs in a
+    copy of the context (contextvars.copy_context), or explicitly with timings.span().
+    """
+
+    def __init__(self, run: str = "run"):
+        self.run = run
+        self.records = [] #(name, start offset, seconds, thread, fields)
+        self._lock = threading.Lock()
+        self._token = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.elapsed = None
+
+    @contextmanager
+    def span(self, name: str, **fields):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.records.append((name, start - self._start, end - start, threading.current_thread().name, fields))
+
+    def __enter__(self):
+        self._token = _collector.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _collector.reset(self._token)
+        self.elapsed = time.perf_counter() - self._start
+        return False
+
+    def total(self) -> float:
+        """Wall time of the run, up to now if it is still running"""
+        return self.elapsed if self.elapsed is not None else time.perf_counter() - self._start
+
+    def breakdown(self) -> pd.DataFrame:
+        """Calls, total / mean / max seconds and share of the run's wall time per stage, in order of first call"""
+
+        columns = ["calls", "total_s", "mean_ms", "max_ms", "share_%"]
+        if not self.records:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name="stage"))
+
+        with self._lock:
+            spans = pd.DataFrame([(name, seconds) for name, _, seconds, _, _ in self.records], columns=["stage", "seconds"])
+        grouped = spans.groupby("stage", sort=False)["seconds"]
+        table = pd.DataFrame({
+            "calls": grouped.count(),
+            "total_s": grouped.sum(),
+            "mean_ms": grouped.mean()*1e3,
+            "max_ms": grouped.max()*1e3,
+        })
+        table["share_%"] = table["total_s"]/self.total()*100
+        return table.round({"total_s": 4, "mean_ms": 2, "max_ms": 2, "share_%": 1})
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [{"name": name, "start_s": round(start, 6), "seconds": round(seconds, 6), "thread": thread, **fields}
+                     for name, start, seconds, thread, fields in self.records]
+        return {"run": self.run, "started_at": self.started_at, "elapsed_s": round(self.total(), 6), "spans": spans}
+
+    def log(self, log: logging.Logger | None = None, level: int = logging.INFO, **fields):
+        """Emit the run as one JSON line (fields, e.g. the tickers, are added at the top level)"""
+        (log or logger).log(level, json.dumps({**self.to_dict(), **fields}, default=str))
+
+
+@contextmanager
+def profile(path: str):
+    """Profile the block and write the result to path: a pyinstrument HTML report for a .html path
+    (requires pyinstrument), otherwise cProfile stats for pstats / snakeviz (.prof)."""
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(".html"):
+        from pyinstrument import Profiler #optional dependency, only needed for HTML reports
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        return
+
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -2,15 +2,21 @@ import panel as pn
 import pandas as pd
 import datetime as dt
 pn.extension('tabulator')
-import hvplot.pandas
-import holoviews as hv
 import threading
-from bokeh.models import HoverTool
-from bokeh.models import NumeralTickFormatter
+import os
+import contextvars
+from contextlib import ExitStack
+from bokeh.models import NumeralTickFormatter #bokeh is already loaded by panel
 
-from dca_simulator.data_loader import load_price_data, load_multiple_price_data
+from dca_simulator.data_loader import load_price_data, load_multiple_price_data, get_price_store
 from dca_simulator.strategies import (dca_standard, dca_DD, lump_sum, dca_sma_mom, dca_sma_mean_rev, value_averaging)
 from dca_simulator.metrics import compute_KeyMetrics
+from dca_simulator.indicators import IndicatorCache
+from dca_simulator.result_cache import ResultCache, make_key
+from dca_simulator.plots import DEFAULT_PLOT_POINTS, downsample_plot
+from dca_simulator.job_queue import JobCancelled, SessionQueue, get_worker_pool
+from dca_simulator.timing import Timings, profile, span
+from dca_simulator.portfolio import parse_weights, portfolio_index
 
 
 
@@ -242,6 +248,44 @@ def update_preset_info(event):
 strategy_presets.param.watch(update_preset_info, "value")
 
 
+##portfolio construction (several tickers): how contributions are split across the tickers
+weighting_options = {
+    "Equal weight": "equal",
+    "Market cap": "market_cap",
+    "Price weighted (average of prices)": "price",
+    "Custom": "custom"}
+portfolio_weighting = pn.widgets.Select(name="Weighting", options=list(weighting_options), value="Equal weight", width=200)
+custom_weights = pn.widgets.TextInput(name="Custom weights", placeholder="AAPL: 0.5, MSFT: 0.3, NVDA: 0.2", width=200, visible=False)
+rebalance_options = {
+    "Monthly": "monthly",
+    "Quarterly": "quarterly",
+    "Yearly": "yearly",
+    "Never (buy and hold)": "never"}
+rebalance_select = pn.widgets.Select(name="Rebalancing", options=list(rebalance_options), value="Monthly", width=200)
+
+def update_weighting(event):
+    """Show the weights input for custom weights, and for the capitalizations of the market cap weighting"""
+    custom_weights.visible = event.new in ("Custom", "Market cap")
+    if event.new == "Market cap":
+        custom_weights.name, custom_weights.placeholder = "Market caps", "AAPL: 3.4e12, MSFT: 3.1e12"
+    else:
+        custom_weights.name, custom_weights.placeholder = "Custom weights", "AAPL: 0.5, MSFT: 0.3, NVDA: 0.2"
+portfolio_weighting.param.watch(update_weighting, "value")
+
+def portfolio_inputs(tickers: list) -> dict:
+    """portfolio_index options of the weighting widgets, ValueError for invalid weights or capitalizations"""
+    portfolio = {"weighting": weighting_options[portfolio_weighting.value], "rebalance": rebalance_options[rebalance_select.value]}
+    if len(tickers) > 1 and portfolio["weighting"] == "custom":
+        portfolio["weights"] = parse_weights(custom_weights.value)
+    elif len(tickers) > 1 and portfolio["weighting"] == "market_cap":
+        caps = parse_weights(custom_weights.value)
+        missing = [ticker for ticker in tickers if ticker not in caps]
+        if missing:
+            raise ValueError(f"Market cap weighting needs the capitalization of every ticker, missing: {', '.join(missing)}")
+        portfolio["market_caps"] = caps
+    return portfolio
+
+
 
 ##box checker for strategy selection
 strategy_selector = pn.widgets.CheckBoxGroup(name="Strategies", 
@@ -278,6 +322,12 @@ plot_var = pn.widgets.Select(name="Variable to plot",
                              options=list(plot_var_options.keys()),
                              value="Portfolio Value ($)")
 
+##points drawn per line, long daily series are downsampled on the server (zooming in shows the exact data)
+plot_points = pn.widgets.IntInput(name="Points per line (0 = all)", value=DEFAULT_PLOT_POINTS, start=0, step=250, width=200)
+
+##opt-in timing of each stage of a run (load, clean, strategies, metrics, plotting), also logged as JSON
+show_timings = pn.widgets.Checkbox(name="Show timing breakdown", value=bool(os.environ.get("DCA_SIMULATOR_TIMINGS")))
+
 ##run and preview buttons
 preview_button = pn.widgets.Button(name="Preview Data", button_type="primary")
 run_button = pn.widgets.Button(name="Run Simulation", button_type="primary")
@@ -334,22 +384,28 @@ strategy_selector.param.watch(update_visibility_sliders, "value")
 
 ####Output####
 error_pane = pn.pane.Alert("", alert_type="danger", visible=False)
+warning_pane = pn.pane.Alert("", alert_type="warning", visible=False) #tickers skipped while loading
 
 ##loading / status feedback
 loading_spinner = pn.indicators.LoadingSpinner(value=True, visible=False, width=40, height=40)
 status_pane = pn.pane.Markdown("", visible=False, sizing_mode="stretch_width")
 status_row = pn.Row(loading_spinner, status_pane, visible=False)
 
-##preview and stats
-preview_pane = pn.pane.HoloViews(None, sizing_mode="stretch_width", height=350)
+##preview and stats (Placeholder instead of pn.pane.HoloViews, which imports holoviews on creation; the
+##HoloViews pane is created when the first plot is assigned)
+preview_pane = pn.pane.Placeholder(None, sizing_mode="stretch_width", height=350)
 stats_pane = pn.pane.Markdown("", visible=False, sizing_mode="stretch_width")
 
 ##plot
-plot_pane = pn.pane.HoloViews(None, sizing_mode="stretch_width", height = 350)
+plot_pane = pn.pane.Placeholder(None, sizing_mode="stretch_width", height = 350)
 
 ##metrics comparison table
 metrics_pane = pn.widgets.Tabulator(None, sizing_mode="stretch_width", disabled=True, theme='bootstrap')
 
+##timing breakdown of the last run (only with show_timings)
+timings_title = pn.pane.Markdown("## Timing Breakdown", visible=False)
+timings_pane = pn.widgets.Tabulator(None, sizing_mode="stretch_width", disabled=True, theme='bootstrap', visible=False)
+
 
 #Layout 
 template = pn.template.FastListTemplate(title = "Retail Investment Strategy Backtester", 
@@ -373,22 +429,31 @@ template = pn.template.FastListTemplate(title = "Retail Investment Strategy Back
              DD_treshold_slider,
              sma_period_slider,
              growth_slider,
+             pn.pane.Markdown("### Portfolio (several tickers)"),
+             portfolio_weighting,
+             custom_weights,
+             rebalance_select,
              pn.pane.Markdown("### Strategies"), 
              strategy_selector, 
              info_pane,
              pn.pane.Markdown("### Plot Settings"), 
              plot_var, 
+             plot_points,
+             show_timings,
              run_button],
 
         main=[status_row,
               error_pane,
+              warning_pane,
               pn.pane.Markdown("## Data Preview"),
               preview_pane,
               stats_pane,
               pn.pane.Markdown("## Strategy Plot"),
               plot_pane,
               pn.pane.Markdown("## Key Metrics"),
-              metrics_pane])
+              metrics_pane,
+              timings_title,
+              timings_pane])
 template.servable()
 
 
@@ -405,6 +470,51 @@ def _safe_next_tick(fn):
     else:
         doc.add_next_tick_callback(fn)
 
+class _BatchedUpdates:
+    """
+    Stream partial results from a worker to the UI without flooding the Bokeh document.
+    push(**fields) records the latest value of each field (status, plot, metrics, ...) and
+    schedules one _safe_next_tick callback; fields pushed before that callback runs are
+    applied together in the same tick, only their latest values. flush() makes sure the
+    last pushed fields are applied.
+    """
+
+    def __init__(self, apply):
+        self._apply = apply #apply(fields), runs on the document thread
+        self._context = contextvars.copy_context() #in the worker's context, so timing spans of the updates reach its collector
+        self._lock = threading.Lock()
+        self._fields = {}
+        self._scheduled = False
+
+    def push(self, **fields):
+        with self._lock:
+            self._fields.update(fields)
+            if self._scheduled:
+                return #merged into the pending tick
+            self._scheduled = True
+        _safe_next_tick(self._run)
+
+    def flush(self):
+        with self._lock:
+            if self._scheduled or not self._fields:
+                return
+            self._scheduled = True
+        _safe_next_tick(self._run)
+
+    def _run(self):
+        with self._lock:
+            fields, self._fields = self._fields, {}
+            self._scheduled = False
+        if fields:
+            self._context.run(self._apply, fields)
+
+def _import_plotting():
+    """
+    Register the .hvplot accessor. hvplot (and holoviews) take about a second to import,
+    so they are loaded by the first preview/simulation worker instead of at startup.
+    """
+    import hvplot.pandas  # noqa: F401
+
 def _set_loading(is_loading: bool, message: str = ""):
     """
     Update loading spinner and status pane state.
@@ -427,6 +537,18 @@ def _clear_error():
     Clear any existing error message."""
     error_pane.visible = False
     error_pane.object = ""
+    warning_pane.visible = False
+    warning_pane.object = ""
+
+def _set_load_warnings(errors: dict):
+    """
+    List the tickers that could not be loaded (ticker -> reason).
+    """
+    if not errors:
+        return
+    skipped = ", ".join(f"{ticker} ({reason})" for ticker, reason in errors.items())
+    warning_pane.object = f"Skipped tickers: {skipped}"
+    warning_pane.visible = True
 
 def _set_status(message: str):
     """
@@ -436,6 +558,114 @@ def _set_status(message: str):
     status_pane.object = message
 
 
+##cache of loaded prices and strategy results, so re-runs with unchanged inputs are served from memory
+result_cache = ResultCache(max_bytes=256*1024**2)
+
+def _load_portfolio(tickers: list, start_str: str, end_str: str, progress=None):
+    """
+    Load several tickers through the result cache. Returns (merged, load_errors).
+    Incomplete loads (some tickers failed) are not cached so they are retried next time.
+    progress(done, total, ticker) is called as each ticker is loaded.
+    """
+    key = make_key("prices", tuple(tickers), start_str, end_str)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    load_errors = {}
+    merged = load_multiple_price_data(tickers, start_str, end_str, errors=load_errors, progress=progress)
+    if merged is not None and not merged.empty and not load_errors:
+        result_cache.put(key, (merged, load_errors))
+    return merged, load_errors
+
+def _load_single(ticker: str, start_str: str, end_str: str):
+    """
+    Load one ticker through the result cache.
+    """
+    key = make_key("prices", (ticker,), start_str, end_str)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    df = load_price_data(ticker, start_str, end_str)
+    if df is not None and not df.empty:
+        result_cache.put(key, df)
+    return df
+
+def _cache_status(indicators: IndicatorCache | None = None) -> str:
+    """
+    One line summary of the result cache, the shared price store and the indicators of the run for the status pane.
+    """
+    stats = result_cache.stats()
+    message = (f"Result cache: {stats['hits']} hits / {stats['misses']} misses, "
+               f"{stats['entries']} entries ({stats['bytes']/1024**2:,.1f} of {stats['max_bytes']/1024**2:,.0f} MB)")
+    store = get_price_store()
+    if store is not None: #shared by all sessions
+        stats = store.stats()
+        message += (f" · Shared prices: {stats['tickers']} tickers ({stats['bytes']/1024**2:,.1f} of "
+                    f"{stats['max_bytes']/1024**2:,.0f} MB), {stats['hits']} hits / {stats['misses']} misses")
+    if indicators is not None: #shared by the strategies of the run
+        stats = indicators.stats()
+        message += f" · Indicators: {stats['hits']} hits / {stats['misses']} misses"
+    return message
+
+
+##background jobs: a bounded pool shared by all sessions, one queue per session
+job_queue = SessionQueue(get_worker_pool())
+pn.state.on_session_destroyed(lambda session_context: job_queue.cancel_all())
+
+def _loading_progress(updates: _BatchedUpdates):
+    """
+    progress callback for _load_portfolio that streams "Loaded 3/15 tickers" to the status pane.
+    """
+    return lambda done, total, ticker: updates.push(status=f"Loaded {done}/{total} tickers ({ticker})")
+
+def _job_status() -> str:
+    """
+    One line summary of the shared worker pool for the status pane.
+    """
+    stats = get_worker_pool().stats()
+    return (f"Jobs: {stats['running']} running / {stats['queued']} queued on {stats['workers']} workers, "
+            f"wait p50 {stats['wait_p50']:.2f}s, run p50 {stats['run_p50']:.2f}s / p95 {stats['run_p95']:.2f}s, "
+            f"{stats['cancelled']} cancelled, {stats['deduplicated']} merged")
+
+
+##profiles of each simulation are written here when set (cProfile .prof files, or pyinstrument .html
+##reports with DCA_SIMULATOR_PROFILER=pyinstrument)
+PROFILE_DIR = os.environ.get("DCA_SIMULATOR_PROFILE")
+_profile_lock = threading.Lock() #one profiler at a time in the process
+
+def _show_timings(timings: Timings | None, **log_fields):
+    """
+    Log and display the timing breakdown of a run (hidden when timings are off). Scheduled after
+    the run's last UI update, so the breakdown includes it.
+    """
+    timings_title.visible = timings_pane.visible = timings is not None
+    if timings is not None:
+        timings.log(**log_fields)
+        timings_pane.value = timings.breakdown()
+
+def _instrumented(run: str, worker, timed: bool, **log_fields):
+    """
+    Wrap a job function in the opt-in timing collector (breakdown table and one JSON log line
+    per run) and, with DCA_SIMULATOR_PROFILE set, in a profiler.
+    """
+    def instrumented(job):
+        timings = Timings(run) if timed else None
+        with ExitStack() as stack:
+            if timings is not None:
+                stack.enter_context(timings)
+            if PROFILE_DIR and _profile_lock.acquire(blocking=False):
+                stack.callback(_profile_lock.release)
+                suffix = "html" if os.environ.get("DCA_SIMULATOR_PROFILER") == "pyinstrument" else "prof"
+                stack.enter_context(profile(os.path.join(PROFILE_DIR, f"{run}-{dt.datetime.now():%Y%m%d-%H%M%S}.{suffix}")))
+            worker(job)
+
+        if not job.cancelled:
+            _safe_next_tick(lambda: _show_timings(timings, **log_fields))
+    return instrumented
+
+
 def preview_data(event=None):
     """Load and display price data without running strategies"""
     _clear_error()
@@ -445,12 +675,20 @@ def preview_data(event=None):
     selected_tickers = get_selected_tickers()
     start_value = start_date.value
     end_value = end_date.value
+    plot_points_value = plot_points.value
 
     # ---- Input validation ----
     if not validate_dates():
         _set_error("Invalid date range. Start Date must be before End Date.")
         _set_loading(False)
         return
+
+    try:
+        portfolio = portfolio_inputs(selected_tickers)
+    except ValueError as e:
+        _set_error(str(e))
+        _set_loading(False)
+        return
     
     if not selected_tickers:
         _set_error("Please select at least one ticker.")
@@ -462,8 +700,14 @@ def preview_data(event=None):
         _set_loading(False)
         return
     
-    def worker():
+    def worker(job):
+        def show_progress(fields):
+            if not job.cancelled:
+                _set_status(fields["status"])
+
+        progress = _BatchedUpdates(show_progress) #per-ticker loading progress
         try:
+            _import_plotting()
             start_str = start_value.strftime("%Y-%m-%d")
             end_str = end_value.strftime("%Y-%m-%d")
 
@@ -472,9 +716,12 @@ def preview_data(event=None):
             if is_portfolio:
                 _safe_next_tick(lambda: _set_status(f"Loading price data for {len(selected_tickers)} tickers"))
 
-                merged = load_multiple_price_data(selected_tickers, start_str, end_str)
+                merged, load_errors = _load_portfolio(selected_tickers, start_str, end_str, _loading_progress(progress))
+                if load_errors:
+                    _safe_next_tick(lambda: _set_load_warnings(load_errors))
                 if merged is None or merged.empty:
                     raise ValueError("No data found for the selected tickers.")
+                job.check()
 
                 price_cols = [c for c in merged.columns if c not in ["Date", "Portfolio"]]
 
@@ -489,17 +736,20 @@ def preview_data(event=None):
                                                  height=500, responsive=True,
                                                  legend="left",
                                                  line_width=1).opts(legend_spacing=1, hooks=[format_preview_axis])
+                preview_obj = downsample_plot(preview_obj, plot_points_value)
                 
-                stats_text = f"""### Price Statistics (Portfolio Average)
-- **Min Price:** ${merged["Portfolio"].min():,.2f}
-- **Max Price:** ${merged["Portfolio"].max():,.2f}
-- **Mean Price:** ${merged["Portfolio"].mean():,.2f}
-- **Std Dev:** ${merged["Portfolio"].std():,.2f}"""
+                #the unit the strategies buy, under the chosen weighting and rebalancing (starts at 100)
+                unit = portfolio_index(merged, **portfolio)
+                stats_text = f"""### Portfolio Unit Statistics ({portfolio_weighting.value}, {rebalance_select.value.lower()} rebalancing, start = 100)
+- **Min Value:** {unit.min():,.2f}
+- **Max Value:** {unit.max():,.2f}
+- **Mean Value:** {unit.mean():,.2f}
+- **Std Dev:** {unit.std():,.2f}"""
 
             else:
                 _safe_next_tick(lambda: _set_status(f"Loading price data for {selected_tickers[0]}")) 
                 ticker = selected_tickers[0]
-                df = load_price_data(ticker, start_str, end_str)
+                df = _load_single(ticker, start_str, end_str)
                 if df is None or df.empty:
                     raise ValueError(f"No data found for ticker: {ticker}")
 
@@ -508,6 +758,7 @@ def preview_data(event=None):
 
                 preview_obj = df.hvplot.line(
                     y="Close", title=f"{ticker} Price History", height=350, responsive=True).opts(hooks=[format_preview_axis])
+                preview_obj = downsample_plot(preview_obj, plot_points_value)
                 
                 stats_text = f"""### Price Statistics ({ticker})
 - **Min Price:** ${df["Close"].min():,.2f}
@@ -517,18 +768,26 @@ def preview_data(event=None):
 
             def apply_preview():
                 """Update UI with preview results"""
+                if job.cancelled: #a newer preview is on its way
+                    return
                 preview_pane.object = preview_obj
                 stats_pane.object = stats_text
                 stats_pane.visible = True
             _safe_next_tick(apply_preview)
 
+        except JobCancelled:
+            return
+
         except Exception as e:
             print(f"Error during data preview: {e}")
             _safe_next_tick(lambda: _set_error(str(e)))
 
         finally:
-            _safe_next_tick(lambda: _set_loading(False, ""))
-    threading.Thread(target=worker, daemon=True).start()
+            if not job.cancelled: #the superseding job owns the loading state
+                _safe_next_tick(lambda: _set_loading(False, ""))
+
+    key = make_key("preview", tuple(selected_tickers), start_value, end_value, plot_points_value, sorted(portfolio.items()))
+    job_queue.submit("preview", key, worker)
 preview_button.on_click(preview_data)
 
 
@@ -549,6 +808,8 @@ def style_metrics_table(df):
 
 
 
+_last_run = None #inputs of the last simulation that completed, re-plotted when the plot settings change
+
 def run_simulation(event=None):
     """Run the simulation based on inputs"""
     # UI updates first so the user immediately sees feedback
@@ -558,14 +819,7 @@ def run_simulation(event=None):
     # Copy all user inputs (on main thread) so the background thread can use these frozen values safely
     selected_tickers = get_selected_tickers()
     selected_strategies = list(strategy_selector.value or [])
-    selected_var = plot_var_options[plot_var.value]
-    monthly_contrib_value = monthly_contrib.value
-    dd_threshold_value = DD_treshold_slider.value
-    sma_period_value = sma_period_slider.value
-    growth_value = growth_slider.value
     start_value = start_date.value
-    end_value = end_date.value
-
 
     # ---- Input validation ----
     if not validate_dates():
@@ -594,8 +848,66 @@ def run_simulation(event=None):
         _set_loading(False, "")
         return
 
-    def worker(): #this runs in a background thread
+    try:
+        portfolio = portfolio_inputs(selected_tickers)
+    except ValueError as e:
+        _set_error(str(e))
+        _set_loading(False, "")
+        return
+
+    _submit_simulation({
+        "selected_tickers": selected_tickers,
+        "selected_strategies": selected_strategies,
+        "selected_var": plot_var_options[plot_var.value],
+        "monthly_contrib_value": monthly_contrib.value,
+        "dd_threshold_value": DD_treshold_slider.value,
+        "sma_period_value": sma_period_slider.value,
+        "growth_value": growth_slider.value,
+        "start_value": start_value,
+        "end_value": end_date.value,
+        "plot_points_value": plot_points.value,
+        "timings_value": show_timings.value,
+        "portfolio": portfolio,
+    })
+
+
+def _submit_simulation(inputs: dict):
+    """Queue the simulation of frozen, validated inputs on the worker pool"""
+    selected_tickers = inputs["selected_tickers"]
+    selected_strategies = inputs["selected_strategies"]
+    selected_var = inputs["selected_var"]
+    monthly_contrib_value = inputs["monthly_contrib_value"]
+    dd_threshold_value = inputs["dd_threshold_value"]
+    sma_period_value = inputs["sma_period_value"]
+    growth_value = inputs["growth_value"]
+    start_value = inputs["start_value"]
+    end_value = inputs["end_value"]
+    plot_points_value = inputs["plot_points_value"]
+    timings_value = inputs["timings_value"]
+    portfolio = inputs["portfolio"]
+
+    def worker(job): #this runs on a worker pool thread
+        def apply_partial(fields):
+            """
+            Update the UI with the partial results streamed by the worker.
+            """
+            if job.cancelled: #a newer run is on its way
+                return
+            with span("ui update"): #the Bokeh models are built here
+                if "status" in fields:
+                    _set_status(fields["status"])
+                if "preview" in fields:
+                    preview_pane.object = fields["preview"]
+                if "plot" in fields:
+                    plot_pane.object = fields["plot"]
+                if "metrics" in fields:
+                    metrics_pane.value = fields["metrics"]
+
+        updates = _BatchedUpdates(apply_partial) #status, preview, strategy curves and metrics rows as they are ready
+        status_message = ""
         try:
+            with span("import plotting"): #first run of the process only
+                _import_plotting()
             # ---- Prepare date strings ----
             start_str = start_value.strftime("%Y-%m-%d")
             end_str = end_value.strftime("%Y-%m-%d")
@@ -605,9 +917,12 @@ def run_simulation(event=None):
             is_portfolio = len(selected_tickers) > 1
 
             if is_portfolio:
-                _safe_next_tick(lambda: _set_status(f"Loading price data for {len(selected_tickers)} tickers")) #update status on main thread from background thread
+                updates.push(status=f"Loading price data for {len(selected_tickers)} tickers") #update status on main thread from background thread
 
-                merged = load_multiple_price_data(selected_tickers, start_str, end_str)
+                with span("load"):
+                    merged, load_errors = _load_portfolio(selected_tickers, start_str, end_str, _loading_progress(updates))
+                if load_errors:
+                    _safe_next_tick(lambda: _set_load_warnings(load_errors))
                 if merged is None or merged.empty:
                     raise ValueError("No data found for the selected tickers.")
 
@@ -616,108 +931,134 @@ def run_simulation(event=None):
                 def format_preview_axis(plot, element):
                     plot.state.yaxis.formatter = NumeralTickFormatter(format="$0,0")
 
-                preview_obj = merged.hvplot.line(x="Date", 
-                                                 y=price_cols,
-                                                 ylabel="Stock Price ($)", 
-                                                 title="Selected Tickers Price History", 
-                                                 height=500, responsive=True,
-                                                 legend="left",
-                                                 line_width=1).opts(legend_spacing=1, hooks=[format_preview_axis])
+                with span("plot"):
+                    preview_obj = merged.hvplot.line(x="Date", 
+                                                     y=price_cols,
+                                                     ylabel="Stock Price ($)", 
+                                                     title="Selected Tickers Price History", 
+                                                     height=500, responsive=True,
+                                                     legend="left",
+                                                     line_width=1).opts(legend_spacing=1, hooks=[format_preview_axis])
+                    preview_obj = downsample_plot(preview_obj, plot_points_value)
 
-                df = merged.set_index("Date")[["Portfolio"]].rename(columns={"Portfolio": "Close"}) #strategies use the portfolio average, not individual tickers
+                #strategies buy units of the portfolio: each contribution is split across the tickers by their weights
+                with span("portfolio"):
+                    df = portfolio_index(merged, **portfolio).to_frame()
 
 
             else:
-                _safe_next_tick(lambda: _set_status(f"Loading price data for {selected_tickers[0]}")) 
+                updates.push(status=f"Loading price data for {selected_tickers[0]}")
                 ticker = selected_tickers[0]
-                df = load_price_data(ticker, start_str, end_str)
+                with span("load"):
+                    df = _load_single(ticker, start_str, end_str)
                 if df is None or df.empty:
                     raise ValueError(f"No data found for ticker: {ticker}")
 
                 def format_preview_axis(plot, element):
                     plot.state.yaxis.formatter = NumeralTickFormatter(format="$0,0")
 
-                preview_obj = df.hvplot.line(
-                    y="Close", title=f"{ticker} Price History", height=350, responsive=True).opts(hooks=[format_preview_axis])
+                with span("plot"):
+                    preview_obj = df.hvplot.line(
+                        y="Close", title=f"{ticker} Price History", height=350, responsive=True).opts(hooks=[format_preview_axis])
+                    preview_obj = downsample_plot(preview_obj, plot_points_value)
 
-            _safe_next_tick(lambda: _set_status("Running strategies…"))
+            updates.push(preview=preview_obj, status="Running strategies…")
 
 
             # ---- Run strategies ----
-            results = {}
-            if "DCA" in selected_strategies:
-                results["DCA"] = dca_standard(df, monthly_contrib_value)
-            if "Double Down DCA" in selected_strategies:
-                results["Double Down DCA"] = dca_DD(df, monthly_contrib_value, dd_threshold_value)
-            if "Lump Sum" in selected_strategies:
-                results["Lump Sum"] = lump_sum(df, monthly_contrib_value)
-            if "Simple Moving Average DCA - Momentum" in selected_strategies:
-                results["SMA Momentum"] = dca_sma_mom(df, monthly_contrib_value, sma_period_value)
-            if "Simple Moving Average DCA - Mean Reversion" in selected_strategies:
-                results["SMA Mean Reversion"] = dca_sma_mean_rev(df, monthly_contrib_value, sma_period_value)
-            if "Value Averaging" in selected_strategies:
-                results["Value Averaging"] = value_averaging(df, growth_value, monthly_contrib_value)
-
-            if not results:
-                raise ValueError("No strategies produced results.")
+            indicators = IndicatorCache() #rolling windows and the monthly resample are computed once for all strategies
+            strategy_runs = [
+                ("DCA", "DCA", dca_standard, {"monthly_contrib": monthly_contrib_value}),
+                ("Double Down DCA", "Double Down DCA", dca_DD, {"monthly_contrib": monthly_contrib_value, "DD_threshold": dd_threshold_value}),
+                ("Lump Sum", "Lump Sum", lump_sum, {"monthly_contrib": monthly_contrib_value}),
+                ("Simple Moving Average DCA - Momentum", "SMA Momentum", dca_sma_mom, {"monthly_contrib": monthly_contrib_value, "sma_period": sma_period_value}),
+                ("Simple Moving Average DCA - Mean Reversion", "SMA Mean Reversion", dca_sma_mean_rev, {"monthly_contrib": monthly_contrib_value, "sma_period": sma_period_value}),
+                ("Value Averaging", "Value Averaging", value_averaging, {"goal_monthly_growth": growth_value, "monthly_contrib": monthly_contrib_value}),
+            ]
 
-            _safe_next_tick(lambda: _set_status("Building plots and metrics…"))
-
-            # ---- Plotting ----
             def format_axis(plot, element):
                 fmt = "$0,0" if selected_var in ["portf_value", "invested_total", "profit_loss"] else "0,0"
                 plot.state.yaxis.formatter = NumeralTickFormatter(format=fmt)
 
+            # each strategy's curve and metrics row are shown as soon as it finishes
+            selected_runs = [run for run in strategy_runs if run[0] in selected_strategies]
             plots = []
-            for name, df_result in results.items():
-                curve = df_result.hvplot(
-                    y=selected_var,
-                    label=name,
-                    ylabel=var_labels.get(selected_var, selected_var), #default to variable name if no label found
-                    title=f"{var_labels.get(selected_var, selected_var)} over Time",
-                    height=350,
-                    responsive=True
-                ).opts(hooks=[format_axis])
-                plots.append(curve)
-
-            combined_plot = plots[0]
-            for c in plots[1:]:
-                combined_plot *= c #overlay plots
-
-
-
-            # ---- Metrics ----
             metrics_rows = []
-            for name, df_result in results.items():
-                m = compute_KeyMetrics(df_result)
+            for i, (option, name, strategy, params) in enumerate(selected_runs, 1):
+                job.check() #superseded by a newer run
+
+                def compute():
+                    df_result = strategy(df, indicators=indicators, **params)
+                    return df_result, compute_KeyMetrics(df_result)
+
+                key = make_key("strategy", tuple(selected_tickers), start_str, end_str, name, sorted(params.items()),
+                               sorted(portfolio.items()) if is_portfolio else None)
+                df_result, metrics = result_cache.get_or_compute(key, compute)
+
+                # ---- Plotting ----
+                with span("plot"):
+                    curve = df_result.hvplot(
+                        y=selected_var,
+                        label=name,
+                        ylabel=var_labels.get(selected_var, selected_var), #default to variable name if no label found
+                        title=f"{var_labels.get(selected_var, selected_var)} over Time",
+                        height=350,
+                        responsive=True
+                    ).opts(hooks=[format_axis])
+                    plots.append(curve)
+
+                    combined_plot = plots[0]
+                    for c in plots[1:]:
+                        combined_plot *= c #overlay plots
+                    combined_plot = downsample_plot(combined_plot, plot_points_value)
+
+                # ---- Metrics ----
+                m = dict(metrics) #cached dicts are shared, do not modify them
                 m["Strategy"] = name
                 metrics_rows.append(m)
-            metrics_df = pd.DataFrame(metrics_rows).set_index("Strategy")
+                metrics_df = pd.DataFrame(metrics_rows).set_index("Strategy")
 
+                status = f"Ran {name} ({i}/{len(selected_runs)})" + ("" if i == len(selected_runs) else ", running the next strategy…")
+                updates.push(plot=combined_plot, metrics=metrics_df, status=status)
 
-           
-  
+            if not plots:
+                raise ValueError("No strategies produced results.")
 
-            def apply_success():
-                """
-                Update the UI with results from the simulation.
-                """
-                preview_pane.object = preview_obj
-                plot_pane.object = combined_plot
-                metrics_pane.value = metrics_df
-                               
+            updates.flush() #the last partial update is the complete result
+            status_message = f"{_cache_status(indicators)}  \n{_job_status()}"
+            global _last_run
+            _last_run = inputs
 
-            _safe_next_tick(apply_success) #update UI on main thread
 
+        except JobCancelled:
+            return
 
         except Exception as e:
             print(f"Error during simulation: {e}")
             _safe_next_tick(lambda: _set_error(str(e)))
 
         finally:
-            _safe_next_tick(lambda: _set_loading(False, ""))
+            if not job.cancelled: #the superseding job owns the loading state
+                _safe_next_tick(lambda: _set_loading(False, status_message))
 
-    threading.Thread(target=worker, daemon=True).start() #start background thread to run simulation, daemon=True so it exits when main program exits
+    #identical runs (double clicks) are merged, a new run cancels the previous one of this session
+    key = make_key("simulation", tuple(selected_tickers), start_value, end_value, tuple(selected_strategies), selected_var,
+                   monthly_contrib_value, dd_threshold_value, sma_period_value, growth_value, plot_points_value,
+                   sorted(portfolio.items()))
+    job_queue.submit("simulation", key, _instrumented("simulation", worker, timings_value, tickers=selected_tickers,
+                                                      start=start_value, end=end_value, strategies=selected_strategies))
 
 ##connecting button with run_simulation
 run_button.on_click(run_simulation)
+
+
+def update_plot_var(event):
+    """Re-plot the last simulation with the new plot settings (strategy results come from the result cache).
+    Uses the inputs of that run, not the widgets, which may have been edited since."""
+    if _last_run is None:
+        return
+    _clear_error()
+    _set_loading(True, "Updating plot…")
+    _submit_simulation({**_last_run, "selected_var": plot_var_options[plot_var.value], "plot_points_value": plot_points.value})
+plot_var.param.watch(update_plot_var, "value")
+plot_points.param.watch(update_plot_var, "value")